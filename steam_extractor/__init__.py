@@ -0,0 +1,2 @@
+# Extracts STEAM game, review and user data, and loads it into SQLite
+# every stage is a module of this package with its own main(argv), see cli.py for the single entry point
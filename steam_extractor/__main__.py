@@ -0,0 +1,7 @@
+# python -m steam_extractor <subcommand> <options>
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
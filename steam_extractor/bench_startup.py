@@ -0,0 +1,104 @@
+# This module measures startup time of the stages
+# compares running each stage module directly (python -m steam_extractor.<module>), through the cli (lazy imports),
+# and as a batch sent to a running "steam-extractor serve" process (no startup at all)
+# every run only prints the stage's help, so the time measured is interpreter, import and argument parsing time
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from .cli import subcommands
+from .serve import read_token, token_path
+
+# the directory containing the package, so "python -m steam_extractor" works without installing it
+baseDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_process(argv, repeat) -> tuple:
+    """median seconds of running argv as a new process, and its last exit status"""
+    times = []
+    status = 0
+    for i in range(repeat):
+        start = time.perf_counter()
+        status = subprocess.run(argv, cwd=baseDir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), status
+
+
+def time_batch(port, token, batch, repeat) -> tuple:
+    """median seconds of sending a batch to a running server, and its last exit status"""
+    times = []
+    status = 0
+    for i in range(repeat):
+        start = time.perf_counter()
+        with socket.create_connection(("127.0.0.1", port)) as sock:
+            sock.sendall((json.dumps({"token": token, "argv": batch, "cwd": baseDir}) + "\n").encode("UTF-8"))
+            with sock.makefile('r', encoding="UTF-8") as f:
+                status = json.loads(f.readline())["status"]
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), status
+
+
+def wait_for_server(port, tokenPathname, timeout) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            if os.path.exists(tokenPathname): return True
+        except OSError:
+            pass
+        time.sleep(0.1)
+    return False
+
+
+def benchmark(repeat, port):
+    python = sys.executable
+    print("%-16s %12s %12s %12s" % ("stage", "module (ms)", "cli (ms)", "serve (ms)"))
+
+    tokenPathname = token_path(port)
+    server = subprocess.Popen([python, "-m", "steam_extractor", "serve", "--port", str(port), "--tokenfile", tokenPathname], cwd=baseDir,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_server(port, tokenPathname, 30):
+            print("Server did not start on port %d" % port)
+            return
+        token = read_token(tokenPathname)
+
+        cliTime, status = time_process([python, "-m", "steam_extractor", "--help"], repeat)
+        print("%-16s %12s %12.1f %12s" % ("(cli help)", "-", cliTime * 1000, "-"))
+
+        for name, (module, description) in subcommands.items():
+            scriptTime, scriptStatus = time_process([python, "-m", "steam_extractor." + module, "--help"], repeat)
+            cliTime, cliStatus = time_process([python, "-m", "steam_extractor", name, "--help"], repeat)
+            serveTime, serveStatus = time_batch(port, token, [name, "--help"], repeat)
+
+            # a non zero status usually means a missing dependency of the stage
+            flags = "" if scriptStatus == cliStatus == serveStatus == 0 else "  (exit status %s/%s/%s)" % (scriptStatus, cliStatus, serveStatus)
+            print("%-16s %12.1f %12.1f %12.1f%s" % (name, scriptTime * 1000, cliTime * 1000, serveTime * 1000, flags))
+    finally:
+        server.terminate()
+        server.wait()
+        if os.path.exists(tokenPathname): os.remove(tokenPathname)   # terminate() on Windows does not let the server remove it
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measures startup time of every stage: module, cli and serve mode')
+    parser.add_argument(
+        '-n', '--repeat', help='Number of runs per measurement (the median is reported). Default: 5',
+        required=False, type=int, default=5)
+    parser.add_argument(
+        '-p', '--port', help='Local TCP port of the benchmark server. Default: 8766',
+        required=False, type=int, default=8766)
+
+    args = parser.parse_args(argv)
+
+    benchmark(args.repeat, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# This module is the single command line entry point of all stages: steam-extractor <subcommand> <options>
+# (or python -m steam_extractor <subcommand> <options>)
+# a stage's module (and its dependencies: requests, bs4, argon2, numpy...) is only imported when its subcommand runs
+# "serve" keeps one process running and accepts batches of subcommands over a local socket (see serve.py),
+# so that a scheduler running many small batches does not pay interpreter and import startup for each of them
+
+import importlib
+import sys
+
+# subcommand: (module of this package, description), the module must provide main(argv)
+subcommands = {
+    "game-ids": ("extract_game_ids", "Downloads all STEAM game IDs from search and save into a file"),
+    "game-data": ("extract_game_data", "Extracts STEAM game titles, release dates, companies, and genres"),
+    "game-reviews": ("extract_game_reviews", "Extracts STEAM game reviews (as well as a list of userIDs)"),
+    "user-data": ("extract_user_data", "Extracts STEAM user profile names and downloads user avatars"),
+    "schedule": ("crawl_scheduler", "Schedules STEAM IDs for extraction in priority order"),
+    "insert": ("insert_data_sqlite", "Inserts STEAM json data from files into SQLite database"),
+    "prepare-db": ("query_data_sqlite", "Creates indexes and aggregate tables for reading the STEAM SQLite database"),
+    "index-reviews": ("index_reviews_fts", "Indexes STEAM game reviews content for full-text search"),
+    "recommend": ("recommend_games", "Computes item-item similar STEAM games from user likes"),
+    "export-columnar": ("export_parquet", "Exports STEAM data from SQLite database into Parquet/Arrow files"),
+    "export-static": ("export_static_json", "Exports STEAM data from SQLite database into compressed static JSON shards"),
+}
+
+defaultPort = 8765
+
+# top-level module of an optional dependency: what to install for it
+installHints = {
+    "requests": "requests",
+    "bs4": "beautifulsoup4",
+    "argon2": "argon2-cffi",
+    "pyarrow": "steam-data-extractor[columnar]",
+    "numpy": "steam-data-extractor[recommend]",
+    "scipy": "steam-data-extractor[recommend]",
+    "brotli": "steam-data-extractor[static]",
+}
+
+
+def import_stage(name):
+    """imports the module of a subcommand"""
+    return importlib.import_module("." + subcommands[name][0], __package__)
+
+
+def run_subcommand(name, argv) -> int:
+    """imports the subcommand's module on first use and runs its main(argv), returns the exit status"""
+    if name not in subcommands:
+        print("Subcommand %s not supported. Supported subcommands: %s" % (name, list(subcommands)))
+        return 2
+
+    sys.argv[0] = "steam-extractor %s" % name   # argparse usage/help shows the subcommand
+    try:
+        import_stage(name).main(argv)
+    except SystemExit as e:   # argparse errors and --help
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except ImportError as e:   # a missing optional dependency, imported with the module or lazily by main
+        missing = (e.name or "").split(".")[0]
+        if missing not in installHints: raise
+        print("Subcommand %s requires the %s module: pip install %s" % (name, missing, installHints[missing]), file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # dispatch before building any parser: the subcommand's own parser handles its options
+    if len(argv) > 0 and argv[0] in subcommands:
+        return run_subcommand(argv[0], argv[1:])
+
+    import argparse   # only needed for the top-level commands
+
+    parser = argparse.ArgumentParser(prog='steam-extractor', description='Extracts STEAM data: one command for every stage',
+        epilog='Stage subcommands: ' + ", ".join(subcommands) + '. Run "steam-extractor <subcommand> -h" for their options.')
+    commands = parser.add_subparsers(dest='command')
+
+    serveParser = commands.add_parser('serve', help='Run stage batches sent over a local socket, without process startup per batch')
+    serveParser.add_argument(
+        '-p', '--port', help='Local TCP port. Default: %d' % defaultPort,
+        required=False, type=int, default=defaultPort)
+    serveParser.add_argument(
+        '--tokenfile', help='File the access token is written to (readable by this user only). Default: ~/.steam_extractor_<port>.token',
+        required=False, default=None)
+    serveParser.add_argument(
+        '--preload', help='Comma separated subcommands to import before serving. Default: none',
+        required=False, default='')
+
+    submitParser = commands.add_parser('submit', help='Send a stage batch to a running server, for example: submit -- game-data -n 10')
+    submitParser.add_argument(
+        '-p', '--port', help='Local TCP port. Default: %d' % defaultPort,
+        required=False, type=int, default=defaultPort)
+    submitParser.add_argument(
+        '--tokenfile', help='Token file of the server. Default: ~/.steam_extractor_<port>.token',
+        required=False, default=None)
+    submitParser.add_argument('batch', nargs=argparse.REMAINDER, help='subcommand and its options')
+
+    for name, (module, description) in subcommands.items():
+        commands.add_parser(name, help=description, add_help=False)   # listed in help only, dispatched above
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        from . import serve
+        serve.serve(args.port, [name for name in args.preload.split(",") if name in subcommands], args.tokenfile)
+    elif args.command == 'submit':
+        from . import serve
+        batch = args.batch[1:] if len(args.batch) > 0 and args.batch[0] == '--' else args.batch
+        return serve.submit(args.port, batch, tokenPathname=args.tokenfile)
+    else:
+        parser.print_help()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+# This script schedules IDs for the extractors in priority order
+# saves the IDs of a stage (game_data, game_reviews, review_summaries, user_data) with a priority into a disk-backed queue (SQLite)
+# priority signals: search rank (input file order), review count (query_summary of STEAM's API), staleness since last fetch
+# extractors run with --queue take the most valuable IDs first, so a run cut short by --deadline keeps the best data
+
+import argparse
+import functools
+import os
+import sqlite3
+import time
+
+from .game_classes import *
+from .parse_pool import ParsePool, fetch_page
+
+supportedStages = ["game_data", "game_reviews", "review_summaries", "user_data"]
+supportedSignals = ["rank", "reviews", "staleness"]
+
+queueTableSQLStrs = [
+"""CREATE TABLE IF NOT EXISTS crawl_queue(
+    stage text NOT NULL, --game_data, game_reviews, review_summaries or user_data
+    item_id text NOT NULL,
+    priority real NOT NULL DEFAULT 0, --higher first
+    scheduled real NOT NULL DEFAULT 0, --timestamp of the last scheduling
+    last_fetched real NOT NULL DEFAULT 0, --timestamp of the last successful extraction, 0 if never
+    PRIMARY KEY (stage, item_id))""",
+
+"CREATE INDEX IF NOT EXISTS idx_crawl_queue_priority ON crawl_queue(stage, priority)",
+]
+
+
+class CrawlQueue:
+    """disk-backed priority queue of the IDs of one stage
+    an ID is due when it was scheduled after its last successful extraction
+    pathname: SQLite file pathname
+    stage: name of the extractor stage
+    """
+    def __init__(self, pathname, stage) -> None:
+        self.stage = stage
+        self.con = sqlite3.connect(pathname)
+        for sqlStr in queueTableSQLStrs:
+            self.con.execute(sqlStr)
+        self.con.commit()
+
+    def push(self, priorities) -> None:
+        """schedules (itemID, priority) pairs, keeps their last fetch time"""
+        now = time.time()
+        self.con.executemany("""INSERT INTO crawl_queue (stage, item_id, priority, scheduled) VALUES (?, ?, ?, ?)
+            ON CONFLICT(stage, item_id) DO UPDATE SET priority = excluded.priority, scheduled = excluded.scheduled""",
+            [(self.stage, str(itemID).strip(), priority, now) for itemID, priority in priorities])
+        self.con.commit()
+
+    def last_fetched(self) -> dict:
+        """dict of itemID: timestamp of its last successful extraction (0 if never)"""
+        return dict(self.con.execute("SELECT item_id, last_fetched FROM crawl_queue WHERE stage = ?", (self.stage,)))
+
+    def top(self, count) -> list:
+        """list of at most count due itemIDs, highest priority first"""
+        return [row[0] for row in self.con.execute("""SELECT item_id FROM crawl_queue
+            WHERE stage = ? AND last_fetched < scheduled ORDER BY priority DESC LIMIT ?""", (self.stage, count))]
+
+    def mark_fetched(self, itemID) -> None:
+        """itemID has been extracted, it is not due until it is scheduled again"""
+        self.con.execute("UPDATE crawl_queue SET last_fetched = ? WHERE stage = ? AND item_id = ?",
+            (time.time(), self.stage, str(itemID).strip()))
+        self.con.commit()
+
+    def close(self) -> None:
+        self.con.close()
+
+
+def review_count_priorities(gameIDs, timeout, fetchers):
+    """yields (gameID, total number of reviews) from the query_summary of STEAM's API, 0 if it cannot be read"""
+    from .extract_game_reviews import parse_review_summary, summaryTemplate   # extract_game_reviews imports this module
+
+    with ParsePool(fetchers) as pool:
+        items = [(gameID, summaryTemplate.substitute({'id': gameID})) for gameID in gameIDs]
+        fetch = functools.partial(fetch_page, timeout=timeout)
+        for gameID, summary, error in pool.run(items, fetch, parse_review_summary):
+            if error is not None:
+                print("Errors occur when reading review summary of game %s (%s), priority 0..." % (gameID, type(error).__name__))
+                yield gameID, 0
+            else:
+                yield gameID, summary.get("total_reviews", 0)
+
+
+def schedule(queuePathname, stage, signal, filename, begin, count, maxEmptyLines, timeout, fetchers):
+    """computes the priority of IDs and saves them into the queue
+    queuePathname: queue SQLite file pathname
+    stage: the extractor stage, one of supportedStages
+    signal: "rank" (input file order), "reviews" (review count, game stages only) or "staleness" (oldest fetch first)
+    filename: input file pathname, None to reschedule the IDs already in the queue (not supported by "rank")
+    begin, count, maxEmptyLines: which lines to read from the input file (IDs already listed before begin are skipped)
+    timeout: seconds for HTTP requests
+    fetchers: number of concurrent requests
+    """
+
+    if stage not in supportedStages:
+        print("Stage %s not supported. Supported stages: %s" % (stage, supportedStages))
+        return
+    if signal not in supportedSignals:
+        print("Signal %s not supported. Supported signals: %s" % (signal, supportedSignals))
+        return
+
+    if signal == "rank" and filename is None:
+        print("Signal rank needs an input file, the IDs already in the queue keep their rank priority")
+        return
+
+    queue = CrawlQueue(queuePathname, stage)
+    lastFetched = queue.last_fetched()
+
+    if filename is None:
+        IDs = list(lastFetched)
+    else:
+        # lines before begin are read too: an ID listed again later (gameids.txt is appended to by every run)
+        # keeps the line number of its first occurrence, and belongs to the batch of that line
+        lines = read_ids(filename, 0, begin + count, maxEmptyLines)
+        if lines is None: return
+        lineNumbers = dict()   # ID: line number of its first occurrence
+        for i, line in enumerate(lines):   # blank lines are counted, they are lines of the file
+            if len(line.strip()) > 0 and line.strip() not in lineNumbers:
+                lineNumbers[line.strip()] = i
+        IDs = [ID for ID, i in lineNumbers.items() if i >= begin]
+
+    if signal == "rank":
+        priorities = [(ID, -lineNumbers[ID]) for ID in IDs]   # first line first, same order across runs with different --begin
+    elif signal == "reviews":
+        if stage == "user_data":
+            print("Signal reviews is only supported by game stages")
+            return
+        priorities = list(review_count_priorities(IDs, timeout, fetchers))
+    else:
+        now = time.time()
+        priorities = [(ID, now - lastFetched.get(ID, 0)) for ID in IDs]   # never fetched: oldest
+
+    queue.push(priorities)
+    queue.close()
+
+    # print summary
+    print("Work done.\nScheduled %d IDs of stage %s by %s into %s." % (len(priorities), stage, signal, queuePathname))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Schedules STEAM IDs for extraction in priority order')
+    parser.add_argument(
+        '-s', '--stage', help='The stage to schedule, should be one of {game_data, game_reviews, review_summaries, user_data}',
+        required=True)
+    parser.add_argument(
+        '-p', '--signal', help='Priority signal, should be one of {rank, reviews, staleness}. Default: rank',
+        required=False, default='rank')
+    parser.add_argument(
+        '-q', '--queue', help='Queue pathname. Default: output/crawlQueue.db',
+        required=False, default='output/crawlQueue.db')
+
+    parser.add_argument(
+        '-i', '--input', help='Input file pathname (IDs to add). Default: reschedule the IDs already in the queue (reviews and staleness signals)',
+        required=False, default=None)
+    parser.add_argument(
+        '--begin', help='Which line (element) to read from within the input file. Default: 0',
+        required=False, type=int, default=0)
+    parser.add_argument(
+        '-n', '--count', help='number of IDs to read from the input file. Default: 1000000',
+        required=False, type=int, default=1000000)
+    parser.add_argument(
+        '-r', '--maxemptylines', help='Maximum number of empty lines in the input file before stopping reading. Default: 5',
+        required=False, type=int, default=5)
+    parser.add_argument(
+        '-t', '--timeout', help='Timeout in seconds for http connections. Default: 120',
+        required=False, type=int, default=120)
+    parser.add_argument(
+        '-f', '--fetchers', help='Number of concurrent requests (reviews signal). Default: 1',
+        required=False, type=int, default=1)
+
+    args = parser.parse_args(argv)
+
+    queueDir = os.path.dirname(args.queue)
+    if queueDir != "" and not os.path.exists(queueDir):
+        os.makedirs(queueDir)
+
+    schedule(args.queue, args.stage, args.signal, args.input, args.begin, args.count, args.maxemptylines, args.timeout, args.fetchers)
+
+
+if __name__ == '__main__':
+    main()
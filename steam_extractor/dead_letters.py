@@ -0,0 +1,131 @@
+# This includes the dead-letter store shared by the extractors
+# IDs that failed (request error, unparseable page, API error) are saved with their error class and attempt count
+# into a SQLite file, so a later --retry-failed pass can re-drive only those IDs
+
+import json
+import os
+import re
+import sqlite3
+import time
+
+deadLetterTableSQLStr = """CREATE TABLE IF NOT EXISTS dead_letters(
+    stage text NOT NULL, --game_data, game_reviews, review_summaries or user_data
+    item_id text NOT NULL,
+    error_class text NOT NULL,
+    error text NOT NULL DEFAULT "",
+    attempts integer NOT NULL DEFAULT 1,
+    last_attempt integer NOT NULL, --timestamp
+    PRIMARY KEY (stage, item_id))"""
+
+# URLs in error messages (requests adds "for url: <URL>" or "with url: <path>?<query>") may hold the STEAM API key
+urlPattern = re.compile(r"https?://\S+|(?<=url: )\S+|[?&]key=\S+")
+
+
+class APIError(Exception):
+    """STEAM's API answered, but reported no success or returned no data"""
+    pass
+
+
+class PageError(Exception):
+    """STEAM answered with a webpage that does not hold the expected data"""
+    pass
+
+
+class DeadLetters:
+    """durable store of failed IDs of one stage
+    pathname: SQLite file pathname
+    stage: name of the extractor stage, IDs of different stages do not mix
+    """
+    def __init__(self, pathname, stage) -> None:
+        self.stage = stage
+        self.con = sqlite3.connect(pathname)
+        self.con.execute(deadLetterTableSQLStr)
+        self.con.execute("UPDATE dead_letters SET error = '' WHERE error LIKE '%key=%'")   # saved before messages were cleaned
+        self.con.commit()
+
+    def record(self, itemID, error) -> None:
+        """saves a failure of itemID, error is an exception or an error class name
+        only the HTTP status of HTTP errors is saved, URLs are removed from other messages
+        """
+        errorClass = error if isinstance(error, str) else type(error).__name__
+        self.con.execute("""INSERT INTO dead_letters (stage, item_id, error_class, error, attempts, last_attempt) VALUES (?, ?, ?, ?, 1, ?)
+            ON CONFLICT(stage, item_id) DO UPDATE SET error_class = excluded.error_class, error = excluded.error,
+            attempts = attempts + 1, last_attempt = excluded.last_attempt""",
+            (self.stage, str(itemID).strip(), errorClass, error_message(error), int(time.time())))
+        self.con.commit()   # durable even if the run is killed afterwards
+
+    def resolve(self, itemID) -> None:
+        """removes itemID once it has been extracted successfully"""
+        self.con.execute("DELETE FROM dead_letters WHERE stage = ? AND item_id = ?", (self.stage, str(itemID).strip()))
+        self.con.commit()
+
+    def pending(self, maxAttempts) -> list:
+        """list of (itemID, attempts, last attempt timestamp) that failed less than maxAttempts times, oldest failure first"""
+        return self.con.execute("""SELECT item_id, attempts, last_attempt FROM dead_letters WHERE stage = ? AND attempts < ?
+            ORDER BY last_attempt""", (self.stage, maxAttempts)).fetchall()
+
+    def due(self, maxAttempts, backoff) -> tuple:
+        """returns (list of itemIDs whose backoff has elapsed since their last attempt, timestamp the next one is due or None)"""
+        now = time.time()
+        dueIDs = []
+        nextDue = None
+        for itemID, attempts, lastAttempt in self.pending(maxAttempts):
+            dueTime = lastAttempt + retry_delay(attempts, backoff)
+            if dueTime <= now:
+                dueIDs.append(itemID)
+            elif nextDue is None or dueTime < nextDue:
+                nextDue = dueTime
+        return dueIDs, nextDue
+
+    def close(self) -> None:
+        self.con.close()
+
+
+def error_message(error) -> str:
+    """message of an error that is safe to save: "HTTP <status>" for HTTP errors, otherwise the message without URLs"""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) is not None:
+        return "HTTP %d" % response.status_code
+    return urlPattern.sub("<url>", str(error))[:500]
+
+
+def retry_delay(attempts, backoff, maxDelay=600) -> float:
+    """seconds to wait before retrying an ID that already failed `attempts` times, doubles per attempt"""
+    return min(maxDelay, backoff * 2 ** max(0, attempts - 1))
+
+
+def retry_ids(deadLetters, maxAttempts, backoff, deadline=None) -> list:
+    """returns the failed itemIDs due for a retry pass, an ID is due once retry_delay() has elapsed since its last attempt
+    if none is due yet, waits once until the earliest one is (unless that is after the deadline timestamp)
+    """
+    dueIDs, nextDue = deadLetters.due(maxAttempts, backoff)
+    if len(dueIDs) == 0 and nextDue is not None:
+        if deadline is not None and nextDue > deadline:
+            print("No failed IDs due before the deadline, skip...")
+            return dueIDs
+        print("No failed IDs due yet, wait %d seconds..." % (nextDue - time.time()))
+        time.sleep(max(0, nextDue - time.time()))
+        dueIDs, nextDue = deadLetters.due(maxAttempts, backoff)
+    if nextDue is not None:
+        print("Failed IDs not due yet are left for a later retry pass")
+    return dueIDs
+
+
+def save_json(pathname, data, merge) -> None:
+    """writes a JSON list/dict, or merges it into the existing file (used by retry passes)"""
+    if merge and os.path.exists(pathname):
+        try:
+            with open(pathname, 'r', encoding="UTF-8") as f:
+                existing = json.load(f)
+        except:
+            print("Cannot read file %s, overwrite..." % pathname)
+        else:
+            if isinstance(existing, dict):
+                for key, value in data.items():
+                    existing.setdefault(key, value)   # first seen wins, as within a run
+            else:
+                existing.extend(data)
+            data = existing
+
+    with open(pathname, mode='w', encoding="UTF-8") as f:
+        json.dump(data, f)
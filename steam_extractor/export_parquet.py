@@ -0,0 +1,176 @@
+# This script reads tables from the SQLite database built by insert_data_sqlite.py
+# and exports them as compressed columnar files (Parquet or Arrow IPC)
+# tables: games, game_genres, companies, develop_publish, reviews, likes
+# rows are streamed in chunks so memory stays bounded, each chunk becomes a row group / record batch
+
+import argparse
+import os
+import sqlite3
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# game IDs fit in 32 bits, user IDs (even with the first 7 digits removed), review IDs and timestamps do not
+exportSchemas = {
+    "games": pa.schema([
+        ("id", pa.int32()),
+        ("title", pa.string()),
+        ("date", pa.int64())]),
+    "game_genres": pa.schema([
+        ("game_id", pa.int32()),
+        ("genre", pa.string())]),
+    "companies": pa.schema([
+        ("cid", pa.string()),
+        ("name", pa.string())]),
+    "develop_publish": pa.schema([
+        ("company_id", pa.string()),
+        ("game_id", pa.int32()),
+        ("dev_or_pub", pa.string())]),
+    "reviews": pa.schema([
+        ("user_id", pa.int64()),
+        ("game_id", pa.int32()),
+        ("review_id", pa.int64()),
+        ("timestamp", pa.int64())]),
+    "likes": pa.schema([
+        ("user_id", pa.int64()),
+        ("game_id", pa.int32())]),
+}
+
+# sort order of each exported table, keeps row groups clustered so readers can skip them by min/max statistics
+exportOrders = {
+    "games": "id",
+    "game_genres": "game_id, genre",
+    "companies": "cid",
+    "develop_publish": "game_id, company_id",
+    "reviews": "game_id, review_id",
+    "likes": "game_id, user_id",
+}
+
+supportedFormats = ["parquet", "arrow"]
+
+
+def open_writer(format, pathname, schema, compression):
+    """returns (writer with write_batch() and close(), file to close after the writer or None) for the given format"""
+    if format == "parquet":
+        return pq.ParquetWriter(pathname, schema, compression=compression), None   # closes its own file
+    # Arrow IPC file, only uncompressed files can be memory-mapped without copying
+    # the IPC writer's close() only writes the footer, the file must be closed too
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    sink = pa.OSFile(pathname, 'wb')
+    try:
+        return pa.ipc.new_file(sink, schema, options=options), sink
+    except:
+        sink.close()
+        raise
+
+
+def export_table(con, table, format, out, chunkSize, compression):
+    """streams one table from the database into one columnar file, returns the number of rows exported
+    con: sqlite3 connection of the source database
+    table: the table to export, one of exportSchemas keys
+    format: "parquet" or "arrow"
+    out: output base path
+    chunkSize: number of rows per chunk (row group / record batch)
+    compression: codec name, or None
+    """
+
+    schema = exportSchemas[table]
+    columns = schema.names
+    pathname = os.path.join(out, "%s.%s" % (table, format))
+
+    cur = con.cursor()
+    try:
+        cur.execute("SELECT %s FROM %s ORDER BY %s" % (", ".join(columns), table, exportOrders[table]))
+    except sqlite3.Error as e:
+        print("Error:", " ".join(e.args), "- skip table %s" % table)
+        return 0
+
+    rows = 0
+    try:
+        writer, sink = open_writer(format, pathname + ".tmp", schema, compression)
+        try:
+            while True:
+                chunk = cur.fetchmany(chunkSize)
+                if len(chunk) == 0: break
+
+                # transpose the chunk of rows into columns
+                arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                rows += len(chunk)
+        finally:
+            writer.close()
+            if sink is not None: sink.close()   # before os.replace, an open file cannot be replaced on Windows
+    except:
+        # do not leave a partial export behind, the previous one is kept
+        if os.path.exists(pathname + ".tmp"): os.remove(pathname + ".tmp")
+        raise
+
+    # only replace the previous export once the new one is complete
+    os.replace(pathname + ".tmp", pathname)
+    return rows
+
+
+def export_data(DBPathname, tables, format, out, chunkSize, compression):
+    """
+    DBPathname: the database's pathname
+    tables: list of tables to export
+    format: "parquet" or "arrow"
+    out: output base path
+    chunkSize: number of rows per chunk
+    compression: codec name, "none" for no compression, None for the format's default (zstd for parquet,
+        none for arrow: only uncompressed Arrow IPC files can be memory-mapped without copying)
+    """
+
+    if format not in supportedFormats:
+        print("Format %s not supported. Supported formats: %s" % (format, supportedFormats))
+        return
+
+    if compression is None:
+        compression = "zstd" if format == "parquet" else "none"
+    if compression == "none":
+        compression = None
+
+    con = sqlite3.connect(DBPathname)
+
+    for table in tables:
+        if table not in exportSchemas:
+            print("Table %s not supported. Supported tables: %s" % (table, list(exportSchemas)))
+            continue
+        rows = export_table(con, table, format, out, chunkSize, compression)
+        print("Exported %d rows from table %s" % (rows, table))
+
+    con.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Exports STEAM data from SQLite database into Parquet/Arrow files')
+
+    parser.add_argument(
+        '-d', '--db', help='Input SQLite database pathname',
+        required=True)
+    parser.add_argument(
+        '-o', '--out', help='Output base path. Default: output/columnar',
+        required=False, default='output/columnar')
+    parser.add_argument(
+        '-t', '--tables', help='Comma separated tables to export. Default: games,game_genres,companies,develop_publish,reviews,likes',
+        required=False, default=",".join(exportSchemas))
+    parser.add_argument(
+        '-f', '--format', help='Output format, parquet or arrow. Default: parquet',
+        required=False, default='parquet')
+    parser.add_argument(
+        '-c', '--compression', help='Compression codec (zstd, lz4, snappy for parquet, none). Default: zstd for parquet, none for arrow (memory-mappable)',
+        required=False, default=None)
+    parser.add_argument(
+        '--chunksize', help='Number of rows per row group / record batch. Default: 100000',
+        required=False, type=int, default=100000)
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.out):
+        os.makedirs(args.out)
+
+    export_data(args.db, args.tables.split(","), args.format, args.out, args.chunksize, args.compression)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+# This script reads the SQLite database built by insert_data_sqlite.py
+# and pre-renders compressed static JSON shards for the JavaScript frontend, to be served from a CDN:
+# games/<gameID>.json, genres/<genre>/<page>.json, companies/<companyID>/<page>.json, reviews/<gameID>/<page>.json
+# shards are rendered in parallel processes, and only the shards affected by new data are rewritten (see manifest.json)
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import urllib.parse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .query_data_sqlite import indexSQLStrs, read_only_uri
+
+supportedEncodings = ["gzip", "br"]
+encodingExtensions = {"gzip": ".json.gz", "br": ".json.br"}
+
+# one row per shard group (kind, key), a changed fingerprint means the group's shards have to be rendered again
+fingerprintSQLStrs = {
+    "games": """SELECT g.id, g.title, g.date,
+        (SELECT group_concat(genre) FROM game_genres WHERE game_id = g.id),
+        (SELECT group_concat(dp.company_id || ':' || dp.dev_or_pub || ':' || IFNULL(c.name, '')) FROM develop_publish dp
+            LEFT JOIN companies c ON c.cid = dp.company_id WHERE dp.game_id = g.id),
+        (SELECT COUNT(*) FROM likes WHERE game_id = g.id),
+        (SELECT COUNT(*) FROM reviews WHERE game_id = g.id)
+        FROM games g""",
+    "genres": """SELECT gg.genre, COUNT(g.id), SUM(g.id), SUM(g.date) FROM game_genres gg
+        LEFT JOIN games g ON g.id = gg.game_id GROUP BY gg.genre""",
+    "companies": """SELECT dp.company_id, COUNT(g.id), SUM(g.id), SUM(length(dp.dev_or_pub)), c.name FROM develop_publish dp
+        LEFT JOIN games g ON g.id = dp.game_id LEFT JOIN companies c ON c.cid = dp.company_id GROUP BY dp.company_id""",
+    "reviews": """SELECT game_id, COUNT(*), SUM(review_id), SUM(timestamp), SUM(user_id) FROM reviews GROUP BY game_id""",
+}
+
+workerCon = None   # read-only connection of each worker process
+
+
+def init_worker(DBPathname):
+    global workerCon
+    workerCon = sqlite3.connect(read_only_uri(DBPathname), uri=True)
+
+
+def render_game(key, pageSize):
+    """game detail page: title, date, genres, companies, likes and reviews counts"""
+    row = workerCon.execute("SELECT id, title, date FROM games WHERE id = ?", (key,)).fetchone()
+    genres = [r[0] for r in workerCon.execute("SELECT genre FROM game_genres WHERE game_id = ? ORDER BY genre", (key,))]
+    companies = [{"cid": r[0], "name": r[1], "role": r[2]} for r in workerCon.execute("""SELECT dp.company_id, IFNULL(c.name, dp.company_id), dp.dev_or_pub
+        FROM develop_publish dp LEFT JOIN companies c ON c.cid = dp.company_id WHERE dp.game_id = ? ORDER BY dp.company_id""", (key,))]
+    likes = workerCon.execute("SELECT COUNT(*) FROM likes WHERE game_id = ?", (key,)).fetchone()[0]
+    reviews = workerCon.execute("SELECT COUNT(*) FROM reviews WHERE game_id = ?", (key,)).fetchone()[0]
+
+    game = {"gameID": row[0], "title": row[1], "date": row[2], "genres": genres, "companies": companies,
+        "likes": likes, "reviews": reviews, "reviewPages": (reviews + pageSize - 1) // pageSize}
+    return {"games/%d" % key: game}
+
+
+def paginate(path, header, rows, pageSize):
+    """splits rows into pages {path/<page>: header + page info + rows}, page numbers start at 1"""
+    pages = max(1, (len(rows) + pageSize - 1) // pageSize)
+    shards = dict()
+    for page in range(pages):
+        shard = dict(header)
+        shard.update({"page": page + 1, "pages": pages, "total": len(rows), "items": rows[page * pageSize:(page + 1) * pageSize]})
+        shards["%s/%d" % (path, page + 1)] = shard
+    return shards
+
+
+def render_genre(key, pageSize):
+    """games of a genre, ordered by release date (latest first)"""
+    rows = [{"gameID": r[0], "title": r[1], "date": r[2]} for r in workerCon.execute("""SELECT g.id, g.title, g.date FROM game_genres gg
+        JOIN games g ON g.id = gg.game_id WHERE gg.genre = ? ORDER BY g.date DESC, g.id""", (key,))]
+    return paginate("genres/" + urllib.parse.quote(key, safe=""), {"genre": key}, rows, pageSize)
+
+
+def render_company(key, pageSize):
+    """games developed or published by a company, ordered by release date (latest first)"""
+    name = workerCon.execute("SELECT name FROM companies WHERE cid = ?", (key,)).fetchone()
+    rows = [{"gameID": r[0], "title": r[1], "date": r[2], "role": r[3]} for r in workerCon.execute("""SELECT g.id, g.title, g.date, dp.dev_or_pub
+        FROM develop_publish dp JOIN games g ON g.id = dp.game_id WHERE dp.company_id = ? ORDER BY g.date DESC, g.id""", (key,))]
+    return paginate("companies/" + urllib.parse.quote(key, safe=""), {"cid": key, "name": name[0] if name else key}, rows, pageSize)
+
+
+def render_reviews(key, pageSize):
+    """review index of a game (userIDs without the first 7 digits), latest first"""
+    rows = [{"userID": r[0], "reviewID": r[1], "time": r[2]} for r in workerCon.execute("""SELECT user_id, review_id, timestamp
+        FROM reviews WHERE game_id = ? ORDER BY timestamp DESC, review_id""", (key,))]
+    return paginate("reviews/%d" % key, {"gameID": key}, rows, pageSize)
+
+
+renderers = {"games": render_game, "genres": render_genre, "companies": render_company, "reviews": render_reviews}
+
+
+def write_group(kind, key, pageSize, oldFiles, out, encodings):
+    """renders the shards of one group (runs in a worker process) and writes the ones whose content changed
+    oldFiles: dict of shard path: content hash from the previous export
+    returns (dict of shard path: content hash, number of shards written)
+    """
+    files = dict()
+    written = 0
+    for path, shard in renderers[kind](key, pageSize).items():
+        data = json.dumps(shard, separators=(',', ':'), sort_keys=True).encode("UTF-8")
+        digest = hashlib.sha1(data).hexdigest()
+        files[path] = digest
+
+        pathname = os.path.join(out, *path.split("/"))
+        # unchanged, keep the existing files (unless one of the encodings was not written by the previous export)
+        if oldFiles.get(path) == digest and all(os.path.exists(pathname + encodingExtensions[encoding]) for encoding in encodings): continue
+
+        os.makedirs(os.path.dirname(pathname), exist_ok=True)
+        if "gzip" in encodings:
+            with open(pathname + ".json.gz", mode='wb') as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if "br" in encodings:
+            with open(pathname + ".json.br", mode='wb') as f:
+                f.write(brotli.compress(data, mode=brotli.MODE_TEXT))
+        written += 1
+
+    # remove pages that do not exist any more
+    remove_shards(out, set(oldFiles) - set(files))
+
+    return files, written
+
+
+def write_groups(tasks, pageSize, out, encodings):
+    """write_group() for a batch of (group, kind, key, oldFiles) tasks, returns list of (group, files, written)"""
+    return [(group,) + write_group(kind, key, pageSize, oldFiles, out, encodings) for group, kind, key, oldFiles in tasks]
+
+
+def remove_shards(out, paths):
+    for path in paths:
+        for extension in encodingExtensions.values():
+            pathname = os.path.join(out, *path.split("/")) + extension
+            if os.path.exists(pathname): os.remove(pathname)
+
+
+def export_static(DBPathname, out, pageSize, workers, encodings, full, batchSize=100):
+    """
+    DBPathname: the database's pathname
+    out: output base path of the shards
+    pageSize: number of items per listing / review index page
+    workers: number of worker processes
+    encodings: list of compressed encodings to write, "gzip" and/or "br"
+    full: render every shard instead of only the groups whose data changed
+    batchSize: number of shard groups sent to a worker process at once
+    """
+
+    encodings = [encoding for encoding in encodings if encoding in supportedEncodings]
+    if "br" in encodings and brotli is None:
+        print("Module brotli is not installed, only gzip shards will be written")
+        encodings.remove("br")
+
+    # secondary indexes make the per-group queries below fast
+    # (tables not loaded yet have no index, their shards are skipped below)
+    con = sqlite3.connect(DBPathname)
+    for sqlStr in indexSQLStrs:
+        try:
+            con.execute(sqlStr)
+        except sqlite3.Error as e:
+            print("Error:", " ".join(e.args), "- skip index")
+    con.commit()
+
+    manifestPathname = os.path.join(out, "manifest.json")
+    manifest = dict()
+    if not full and os.path.exists(manifestPathname):
+        with open(manifestPathname, 'r', encoding="UTF-8") as f:
+            manifest = json.load(f)
+
+    # compare fingerprints of every group to find the affected ones
+    newManifest = dict()
+    tasks = []
+    for kind, sqlStr in fingerprintSQLStrs.items():
+        try:
+            rows = con.execute(sqlStr).fetchall()
+        except sqlite3.Error as e:
+            print("Error:", " ".join(e.args), "- skip %s shards" % kind)
+            continue
+        for row in rows:
+            group = "%s/%s" % (kind, row[0])
+            fingerprint = hashlib.sha1(repr((row, pageSize, sorted(encodings))).encode("UTF-8")).hexdigest()   # new encodings render again
+            old = manifest.get(group, {"fingerprint": None, "files": {}})
+            if old["fingerprint"] == fingerprint:
+                newManifest[group] = old
+            else:
+                newManifest[group] = {"fingerprint": fingerprint, "files": old["files"]}
+                tasks.append((group, kind, row[0], old["files"]))
+
+    # genre index for the frontend navigation
+    try:
+        genres = [{"genre": r[0], "games": r[1]} for r in con.execute("SELECT genre, COUNT(*) FROM game_genres GROUP BY genre ORDER BY genre")]
+    except sqlite3.Error as e:
+        print("Error:", " ".join(e.args), "- empty genre index")
+        genres = []
+    con.close()
+
+    from concurrent.futures import ProcessPoolExecutor   # pulls in multiprocessing, only needed once rendering starts
+
+    written = 0
+    with ProcessPoolExecutor(max(1, workers), initializer=init_worker, initargs=(DBPathname,)) as pool:
+        batches = [tasks[i:i + batchSize] for i in range(0, len(tasks), batchSize)]
+        for results in pool.map(write_groups, batches, [pageSize] * len(batches), [out] * len(batches), [encodings] * len(batches)):
+            for group, files, groupWritten in results:
+                newManifest[group]["files"] = files
+                written += groupWritten
+
+    # groups that disappeared from the database
+    for group in set(manifest) - set(newManifest):
+        remove_shards(out, manifest[group]["files"])
+
+    data = json.dumps(genres, separators=(',', ':')).encode("UTF-8")
+    with open(os.path.join(out, "genres.json.gz"), mode='wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+
+    with open(manifestPathname, mode='w', encoding="UTF-8") as f:
+        json.dump(newManifest, f)
+
+    # print summary
+    print("Work done.\nRendered %d of %d shard groups, wrote %d shards into %s." % (len(tasks), len(newManifest), written, out))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Exports STEAM data from SQLite database into compressed static JSON shards')
+
+    parser.add_argument(
+        '-d', '--db', help='Input SQLite database pathname',
+        required=True)
+    parser.add_argument(
+        '-o', '--out', help='Output base path. Default: output/static',
+        required=False, default='output/static')
+    parser.add_argument(
+        '-p', '--pagesize', help='Number of items per listing / review index page. Default: 50',
+        required=False, type=int, default=50)
+    parser.add_argument(
+        '-w', '--workers', help='Number of worker processes. Default: number of CPUs',
+        required=False, type=int, default=os.cpu_count())
+    parser.add_argument(
+        '-e', '--encodings', help='Comma separated compressed encodings to write (gzip, br). Default: gzip,br',
+        required=False, default='gzip,br')
+    parser.add_argument(
+        '--full', help='Render every shard instead of only the shards affected by new data',
+        required=False, action='store_true')
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.out):
+        os.makedirs(args.out)
+
+    export_static(args.db, args.out, args.pagesize, args.workers, args.encodings.split(","), args.full)
+
+
+if __name__ == '__main__':
+    main()
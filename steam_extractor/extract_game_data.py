@@ -0,0 +1,246 @@
+# This script reads a set/list of STEAM game IDs,
+# extracts game data (title, companies, genres, release date) from HTML page
+# saves a list of game data and a set of game company data to JSON files
+# any game ID with age gates will be saved to another text file
+
+import argparse
+import functools
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from .game_classes import *
+from .crawl_scheduler import CrawlQueue
+from .dead_letters import DeadLetters, PageError, retry_ids, save_json
+from .parse_pool import ParsePool, fetch_page
+
+def parse_company_id(URL: str, category: str) -> str:
+    """extract STEAM game company ID string from different URL rules
+    category: "developer" or  "publisher"
+    URL: now support three kinds of URLs:
+    1) https://store.steampowered.com/developer/giantssoftware?snr=1_5_9__408
+    extract giantssoftware
+    2) https://store.steampowered.com/search/?developer=Playground%20Games&snr=1_5_9__408
+    extract Playground%20Games
+    3) https://store.steampowered.com/curator/33975870?snr=1_5_9__400
+    extract curator_33975870
+    """
+    companyID = ""
+    try:
+        if (category + "/") in URL:
+            companyID = URL.replace(category + "/", " ").replace("?", " ").split()[1]
+        elif (category + "=") in URL:
+            companyID = URL.replace(category + "=", " ").replace("&", " ").split()[1]
+        else:
+            companyID = URL.replace(".com/", " ").replace("?", " ").split()[1].replace("/", "_")
+    except:
+        print("Cannot parse str:" + URL)
+        pass
+
+    return companyID
+
+
+def parse_game_page(gameID, pageData):
+    """parses a game's webpage (runs in a parser process)
+    returns (game JSON, dict of game companies), game JSON is None if the game has an age gate
+    raises PageError if the page has no game data (so it is recorded as a failure, not saved as an unknown game)
+    """
+    gameSoup = BeautifulSoup(pageData, features="html.parser")
+    companies = dict()
+
+    # check if there's age_gate
+    ageGate = gameSoup.find('div', attrs={'id':'app_agegate'})  # would never found? - TODO later
+    if ageGate is not None:
+        return None, companies
+
+    # no age gate, extract useful data
+    newGame = Game(gameID)   # create a Game object
+    dataDiv = gameSoup.find('div', attrs={'id':'genresAndManufacturer'})
+    if dataDiv is None:
+        raise PageError("no genresAndManufacturer section")
+    tokens = dataDiv.get_text().split('\n')   # extract game title, date, genres
+    companyRows = dataDiv.find_all('div', attrs={"class": "dev_row"})   # extract company infos
+
+    for s in tokens:
+        if s.startswith("Title:"):
+            newGame.setTitle(s.replace("Title:", "").strip())
+        elif s.startswith("Genre:"):
+            genres = s.replace("Genre:", "").strip().split(",")
+            for genre in genres:
+                newGame.addGenre(genre.strip())
+        elif s.startswith("Release Date:"):
+            newGame.setDate(parse_date(s.replace("Release Date:", "").strip()))
+
+    for companyRow in companyRows:
+        try:
+            category = companyRow.find("b").get_text().replace(":", "").lower()   # "developer"
+            htmlTag = companyRow.find("a")   # <a href="https://store.steampowered.com/curator/33975870?snr=1_5_9__408">Eagle Dynamics SA</a>
+            companyName = htmlTag.get_text().strip()   # Eagle Dynamics SA
+            companyURL = htmlTag['href']
+        except:
+            continue
+
+        if category == "developer":
+            companyID = parse_company_id(companyURL, "developer")
+            if companyID == "": continue
+            newGame.addDevCompany(companyID)
+        elif category == "publisher":
+            companyID = parse_company_id(companyURL, "publisher")
+            if companyID == "": continue
+            newGame.addPubCompany(companyID)
+        else:
+            continue   # e.g. "franchise"
+
+        # add game company into dict
+        if companyID not in companies:
+            companies[companyID] = companyName
+
+    return newGame.toJSON(), companies
+
+
+def extract_game_data(maxEmptyLines, timeout, filename, out, begin, count, fetchers=1, workers=0, chunkSize=16,
+        deadLetters=None, retryFailed=False, maxAttempts=5, backoff=2.0, queue=None, deadline=None):
+    """loops from the set of game IDs and extract data from each game's webpage
+    maxEmptyLines: maximum number of empty lines in the input file before stopping reading
+    timeout: seconds for HTTP requests
+    filename: input file pathname
+    out: output base path
+    begin: which line (element) to read from within the input file
+    count: number of games to extract
+    fetchers: number of concurrent downloads
+    workers: number of parser processes, 0 parses in this process
+    chunkSize: number of pages sent to a parser process at once
+    deadLetters: DeadLetters store recording failed game IDs, or None
+    retryFailed: re-drive only the failed game IDs of deadLetters that are due instead of reading the input file
+    maxAttempts: game IDs that failed this many times are not retried any more
+    backoff: seconds after its last attempt before a game ID is due for its first retry, doubles per attempt
+    queue: CrawlQueue to take the game IDs from, highest priority first, instead of reading the input file
+    deadline: timestamp to stop extracting at, or None
+    """
+
+    baseURL = "http://store.steampowered.com/app/"
+
+    # initialize collections
+    gameIDs = []   # list of game IDs to extract
+    games = []   # list of Game objects
+    companies = dict()   # dict of Game Companies
+    ageGateGames = []   # list of game IDs with age gates
+
+    if retryFailed:
+        gameIDs = [gameID + "\n" for gameID in retry_ids(deadLetters, maxAttempts, backoff, deadline)]   # same format as lines read from the file
+        filename = "dead letters"
+        count = len(gameIDs)
+    elif queue is not None:
+        gameIDs = [gameID + "\n" for gameID in queue.top(count)]   # most valuable first
+        filename = "crawl queue"
+    else:
+        # read gameIDs from the file
+        gameIDs = read_ids(filename, begin, count, maxEmptyLines)
+        if gameIDs is None: return
+
+    # download pages in threads, parse them in processes, merge results here in input order
+    with ParsePool(fetchers, workers, chunkSize) as pool:
+        items = [(gameID, baseURL + gameID) for gameID in gameIDs]
+        fetch = functools.partial(fetch_page, timeout=timeout)
+        for gameID, result, error in pool.run(items, fetch, parse_game_page, deadline):
+            if error is not None:
+                print("Errors occur when extracting %s (%s), skip..." % ((baseURL + gameID).strip(), type(error).__name__))
+                if deadLetters is not None: deadLetters.record(gameID, error)
+                continue
+            if deadLetters is not None: deadLetters.resolve(gameID)
+            if queue is not None: queue.mark_fetched(gameID)
+
+            gameJSON, pageCompanies = result
+            if gameJSON is None:
+                ageGateGames.append(gameID)
+                continue
+
+            games.append(gameJSON)
+            for companyID, companyName in pageCompanies.items():
+                if companyID not in companies:
+                    companies[companyID] = companyName
+
+    # save list of games and dict of companies into two files
+    # (a retry pass merges into the files of the previous run)
+    save_json(os.path.join(out, "gamesData.json"), games, retryFailed)
+    save_json(os.path.join(out, "companiesData.json"), companies, retryFailed)
+
+    # save list of games with age gates
+    with open(os.path.join(out, "ageGateGames.txt"), mode='a', encoding="UTF-8") as f:
+        for ageGateGame in ageGateGames:
+            f.write(str(ageGateGame))
+
+    # print summary
+    print("Work done.\nRead %d lines starting at line %d from %s, extracted %d games data and %d company data, saved %d games with age gates." % (count, begin, filename, len(games), len(companies), len(ageGateGames)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Extracts STEAM game titles, release dates, companies, and genres')
+    parser.add_argument(
+        '-r', '--maxemptylines', help='Maximum number of empty lines in the input file before stopping reading. Default: 5',
+        required=False, type=int, default=5)
+    parser.add_argument(
+        '-t', '--timeout', help='Timeout in seconds for http connections. Default: 120',
+        required=False, type=int, default=120)
+
+    parser.add_argument(
+        '-i', '--input', help='Input file pathname. Default: output/gameids.txt',
+        required=False, default='output/gameids.txt')
+    parser.add_argument(
+        '-o', '--out', help='Output base path',
+        required=False, default='output')
+    parser.add_argument(
+        '--begin', help='Which line (element) to read from within the input file. Default: 0',
+        required=False, type=int, default=0)
+    parser.add_argument(
+        '-n', '--count', help='number of games to extract. Default: 100',
+        required=False, type=int, default=100)
+
+    parser.add_argument(
+        '-f', '--fetchers', help='Number of concurrent page downloads. Default: 1',
+        required=False, type=int, default=1)
+    parser.add_argument(
+        '-w', '--workers', help='Number of parser processes, 0 parses in the main process. Default: 0',
+        required=False, type=int, default=0)
+    parser.add_argument(
+        '--chunksize', help='Number of pages sent to a parser process at once. Default: 16',
+        required=False, type=int, default=16)
+
+    parser.add_argument(
+        '--deadletters', help='Dead-letter store of failed game IDs. Default: <out>/deadLetters.db',
+        required=False, default=None)
+    parser.add_argument(
+        '--retry-failed', help='Only re-extract the failed game IDs of the dead-letter store',
+        required=False, action='store_true')
+    parser.add_argument(
+        '--maxattempts', help='Give up game IDs that failed this many times. Default: 5',
+        required=False, type=int, default=5)
+    parser.add_argument(
+        '--backoff', help='Seconds after the last attempt before a game ID is due for its first retry, doubles per attempt. Default: 2',
+        required=False, type=float, default=2.0)
+    parser.add_argument(
+        '--queue', help='Take the game IDs from this crawl queue (see crawl_scheduler.py), highest priority first, instead of the input file',
+        required=False, default=None)
+    parser.add_argument(
+        '--deadline', help='Stop extracting after this many minutes',
+        required=False, type=float, default=None)
+        
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.out):
+        os.makedirs(args.out)
+
+    deadLetters = DeadLetters(args.deadletters or os.path.join(args.out, "deadLetters.db"), "game_data")
+    queue = CrawlQueue(args.queue, "game_data") if args.queue is not None else None
+    deadline = time.time() + args.deadline * 60 if args.deadline is not None else None
+
+    extract_game_data(args.maxemptylines, args.timeout, args.input, args.out, args.begin, args.count,
+        args.fetchers, args.workers, args.chunksize, deadLetters, args.retry_failed, args.maxattempts, args.backoff, queue, deadline)
+
+    deadLetters.close()
+    if queue is not None: queue.close()
+
+
+if __name__ == '__main__':
+    main()
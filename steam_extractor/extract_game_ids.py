@@ -0,0 +1,140 @@
+# This script downloads all STEAM game IDs from search based on filter
+# and save the game IDs into a text file, in search rank order
+
+import argparse
+import collections
+import functools
+import os
+from bs4 import BeautifulSoup
+
+from .parse_pool import ParsePool, fetch_page
+
+
+def parse_search_page(pageNo, pageData):
+    """parses a search results page (runs in a parser process)
+    returns the list of game IDs (int) on the page, or None if the search results cannot be extracted
+    """
+    pageSoup = BeautifulSoup(pageData, features="html.parser")
+
+    try:
+        gameTags = pageSoup.find('div', attrs={'id':'search_resultsRows'}).find_all('a', recursive=False)
+    except:
+        print("Failed to extract search results on page %s, skip..." % str(pageNo))
+        return None
+
+    gameIDs = []
+    for gameTag in gameTags:
+        try:
+            gameURL = gameTag['href']
+            gameID = gameURL.split("app/")[1].replace("/", " ").split()[0]
+        except:
+            print("Cannot extract gameID from href: %s, skip..." % gameURL)
+            continue
+        gameIDs.append(int(gameID))
+
+    return gameIDs
+
+
+def get_game_ids(maxFailures, timeout, out, beginPage, maxResults, fetchers=1, workers=0, chunkSize=1):
+    """downloads all STEAM game IDs from search and save to a file in search rank order, and returns the list
+    maxFailures: maximum number of failures during extracting
+    timeout: seconds for http connections
+    out: output base path
+    beginPage: page number to start searching
+    maxResults: A rough maximum number of results (not counted each time the set updates)
+    fetchers: number of concurrent page downloads
+    workers: number of parser processes, 0 parses in this process
+    chunkSize: number of pages sent to a parser process at once
+    """
+
+    searchURL = 'http://store.steampowered.com/search/results?sort_by=_ASC&ignore_preferences=1&page='
+
+    gameIDs = []   # initialize list of game ids (int), in search rank order
+    seen = set()   # game ids already in the list
+
+    failures = 0
+    retries = collections.deque()   # failed pages, downloaded again before new pages
+
+    def search_pages():
+        """endless (page number, URL) stream, consecutive pages after retries of failed ones"""
+        newPage = beginPage
+        while True:
+            if len(retries) > 0:
+                p = retries.popleft()
+            else:
+                p = newPage
+                newPage += 1
+            yield p, searchURL + str(p)
+
+    pageNo = beginPage   # next page to add to the list, pages are added in order
+    parsedPages = dict()   # page number: game IDs of pages parsed before an earlier page succeeded
+
+    fetch = functools.partial(fetch_page, timeout=timeout)
+    with ParsePool(fetchers, workers, chunkSize) as pool:
+        # pages are downloaded and parsed concurrently, the next window downloads while this one is parsed
+        for p, pageGameIDs, error in pool.run(search_pages(), fetch, parse_search_page):
+            if pageGameIDs is None:
+                if error is not None:
+                    print("Failed to download or parse %s (%s), skip..." % (searchURL+str(p), type(error).__name__))
+                failures += 1   # a timeout or parse error considered as a failure
+                if failures >= maxFailures: break
+                retries.append(p)   # download this page again, keep the pages already fetched after it
+                continue
+
+            parsedPages[p] = pageGameIDs
+            while pageNo in parsedPages:
+                for gameID in parsedPages.pop(pageNo):   # add each new game ID
+                    if gameID not in seen:
+                        seen.add(gameID)
+                        gameIDs.append(gameID)
+                pageNo += 1
+            # check if reached max results
+            if len(gameIDs) >= maxResults: break
+
+    # save list of game IDs to file (the line order is the search rank, used by crawl_scheduler.py)
+    with open(os.path.join(out, "gameids.txt"), mode='a') as f:
+        for item in gameIDs:
+            f.write("%d\n" % item)
+
+    return gameIDs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Downloads all STEAM game IDs from search and save into a file')
+    parser.add_argument(
+        '-r', '--maxretries', help='Max retries to download data from a webpage. Default: 5',
+        required=False, type=int, default=5)
+    parser.add_argument(
+        '-t', '--timeout', help='Timeout in seconds for http connections. Default: 120',
+        required=False, type=int, default=120)
+
+    parser.add_argument(
+        '-o', '--out', help='Output base path', required=False, default='output')
+    parser.add_argument(
+        '--begin', help='page number to start searching. Default: 0',
+        required=False, type=int, default=0)
+    parser.add_argument(
+        '-n', '--count', help='A rough number of game IDs. Default: 1000',
+        required=False, type=int, default=1000)
+
+    parser.add_argument(
+        '-f', '--fetchers', help='Number of concurrent page downloads. Default: 1',
+        required=False, type=int, default=1)
+    parser.add_argument(
+        '-w', '--workers', help='Number of parser processes, 0 parses in the main process. Default: 0',
+        required=False, type=int, default=0)
+    parser.add_argument(
+        '--chunksize', help='Number of pages sent to a parser process at once. Default: 1',
+        required=False, type=int, default=1)
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.out):
+        os.makedirs(args.out)
+    
+    get_game_ids(args.maxretries, args.timeout, args.out, args.begin, args.count,
+        args.fetchers, args.workers, args.chunksize)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+# This script reads a set/list of STEAM game IDs (without age gates)
+# extracts game reviews index and likes data from STEAM's API and saves to JSON files
+# saves game reviews content into text files with gameID and reviewID as path
+# also saves a list of userIDs into a text file
+# with --summary-only, only extracts review totals per game (optionally statistics of a sample of reviews) into a JSON file
+
+import argparse
+import functools
+import os
+import string
+import time
+import json
+import urllib.parse
+
+from .game_classes import *
+from .crawl_scheduler import CrawlQueue
+from .dead_letters import APIError, DeadLetters, retry_ids, save_json
+from .parse_pool import ParsePool, fetch_page
+
+
+summaryTemplate = string.Template('https://store.steampowered.com/appreviews/$id?json=1&num_per_page=0&language=all&purchase_type=all')
+sampleTemplate = string.Template('https://store.steampowered.com/appreviews/$id?json=1&num_per_page=100&filter=recent&language=all&purchase_type=all')
+
+
+def fetch_review_pages(URL, timeout, pages):
+    """downloads up to pages pages of STEAM's appreviews JSON data following the cursor, returns the list of raw pages"""
+    rawPages = []
+    cursor = "*"
+    for i in range(pages):
+        pageData = fetch_page(URL + "&cursor=" + urllib.parse.quote(cursor), timeout)
+        rawPages.append(pageData)
+        data = json.loads(pageData)
+        if len(data.get("reviews", [])) == 0 or data.get("cursor", cursor) == cursor: break   # no more pages
+        cursor = data["cursor"]
+    return rawPages
+
+
+def parse_reviews(gameID, pageData):
+    """returns the list of reviews of STEAM's appreviews JSON data (raises on failure)"""
+    data = json.loads(pageData)
+    if data["success"] != 1:   # unsuccessful
+        raise APIError("success: %s" % data["success"])
+    return data["reviews"]
+
+
+def parse_review_summary(gameID, pageData):
+    """returns the query_summary of STEAM's appreviews JSON data, requested with num_per_page=0 (raises on failure)
+    keys: num_reviews, review_score, review_score_desc, total_positive, total_negative, total_reviews
+    """
+    data = json.loads(pageData)
+    if data["success"] != 1:   # unsuccessful
+        raise APIError("success: %s" % data["success"])
+    return data["query_summary"]
+
+
+def parse_review_sample(gameID, rawPages):
+    """returns a GameReviewSummary JSON from the raw pages of fetch_review_pages (raises on failure)
+    the query_summary of the first page gives the totals, reviews of all pages give the sample statistics
+    """
+    summary = parse_review_summary(gameID, rawPages[0])
+    reviews = []
+    for pageData in rawPages:
+        reviews += json.loads(pageData).get("reviews", [])   # no reviews with num_per_page=0
+
+    samplePositive = 0
+    playtime = 0
+    playtimeReviews = 0   # reviews with a playtime, the mean is over these only
+    for review in reviews:
+        try:
+            if review["voted_up"]: samplePositive += 1
+        except:
+            pass
+        try:
+            playtime += int(review["author"]["playtime_at_review"])
+            playtimeReviews += 1
+        except:
+            pass
+
+    return GameReviewSummary(gameID, summary["total_reviews"], summary["total_positive"], summary["total_negative"],
+        summary["review_score"], len(reviews), samplePositive, playtime // playtimeReviews if playtimeReviews > 0 else 0).toJSON()
+
+
+def game_ids_to_extract(maxEmptyLines, filename, begin, count, deadLetters, retryFailed, maxAttempts, backoff, queue, deadline):
+    """returns (list of game IDs, source name, count)
+    game IDs come from the dead letters (retry pass, due IDs only), the crawl queue, or the input file; list is None if the file cannot be read
+    """
+    if retryFailed:
+        gameIDs = retry_ids(deadLetters, maxAttempts, backoff, deadline)
+        return gameIDs, "dead letters", len(gameIDs)
+
+    if queue is not None:
+        return queue.top(count), "crawl queue", count   # most valuable first
+
+    # read gameIDs from the file
+    gameIDs = read_ids(filename, begin, count, maxEmptyLines)
+    if gameIDs is None:
+        return None, filename, count
+    return [gameID.strip() for gameID in gameIDs if len(gameID.strip()) > 0], filename, count
+
+
+def extract_game_reviews(maxEmptyLines, timeout, filename, out, begin, count, fetchers=1,
+        deadLetters=None, retryFailed=False, maxAttempts=5, backoff=2.0, queue=None, deadline=None):
+    """loops from the set of game IDs, extract reviews and userIDs from STEAM's API
+    maxEmptyLines: maximum number of empty lines in the input file before stopping reading
+    timeout: seconds for HTTP requests
+    filename: input file pathname
+    out: output base path
+    begin: which line (element) to read from within the input file
+    count: number of games to extract
+    fetchers: number of concurrent requests
+    deadLetters: DeadLetters store recording failed game IDs, or None
+    retryFailed: re-drive only the failed game IDs of deadLetters that are due instead of reading the input file
+    maxAttempts: game IDs that failed this many times are not retried any more
+    backoff: seconds after its last attempt before a game ID is due for its first retry, doubles per attempt
+    queue: CrawlQueue to take the game IDs from, highest priority first, instead of reading the input file
+    deadline: timestamp to stop extracting at, or None
+    """
+
+    urlTemplate = string.Template('https://store.steampowered.com/appreviews/$id?json=1')
+
+    users = set()   # set of userIDs
+    reviewIndexes = []   # set of review indexes
+    userlikes = []   # list of UserLike objects
+
+    gameIDs, filename, count = game_ids_to_extract(maxEmptyLines, filename, begin, count,
+        deadLetters, retryFailed, maxAttempts, backoff, queue, deadline)
+    if gameIDs is None: return
+
+    # get json data from STEAM API
+    with ParsePool(fetchers) as pool:
+        items = [(gameID, urlTemplate.substitute({'id': gameID})) for gameID in gameIDs]
+        fetch = functools.partial(fetch_page, timeout=timeout)
+        for gameID, reviews, error in pool.run(items, fetch, parse_reviews, deadline):
+            if error is not None:
+                print("Errors occur when reading reviews of game %s (%s), skip..." % (gameID, type(error).__name__))
+                if deadLetters is not None: deadLetters.record(gameID, error)
+                continue
+            if deadLetters is not None: deadLetters.resolve(gameID)
+            if queue is not None: queue.mark_fetched(gameID)
+
+            for review in reviews:
+                try:
+                    reviewID = review["recommendationid"]
+                    userID = review["author"]["steamid"]
+                    content = review["review"]
+                    timestamp = review["timestamp_updated"]
+                except:
+                    continue
+
+                reviewIndexes.append(GameReview(userID, gameID, reviewID, timestamp).toJSON())   # save review index into list
+                users.add(userID)   # save user id into list
+
+                # save review content as plain text into file
+                filePath = os.path.join(out, "reviews", gameID)
+                if not os.path.exists(filePath):
+                    os.makedirs(filePath)
+                with open(os.path.join(filePath, reviewID), mode='w', encoding="UTF-8") as rf:
+                    rf.write(content)
+
+                # if user likes this game, save as a UserLike dict
+                try:
+                    if review["voted_up"]:
+                        userlikes.append(UserLike(userID, gameID).toJSON())
+                except:
+                    pass
+
+
+    users = list(users)   # convert set to list
+
+    # save list of unique userIDs into a text file (later extract user data)
+    with open(os.path.join(out, "userids.txt"), mode='a', encoding="UTF-8") as f:
+        for userID in users:   # here is str, without "\n"
+            f.write(userID+"\n")
+    
+    # save list of userlikes and list of review indexes into JSON files
+    # (a retry pass merges into the files of the previous run)
+    save_json(os.path.join(out, "likes.json"), userlikes, retryFailed)
+    save_json(os.path.join(out, "reviews.json"), reviewIndexes, retryFailed)
+
+    # print summary
+    print("Work done.\nRead %d lines starting at line %d from %s, extracted %d reviews data, %d likes data, saved %d userIDs." % (count, begin, filename, len(reviewIndexes), len(userlikes), len(users)))
+
+
+def extract_review_summaries(maxEmptyLines, timeout, filename, out, begin, count, fetchers=1, samplePages=0,
+        deadLetters=None, retryFailed=False, maxAttempts=5, backoff=2.0, queue=None, deadline=None):
+    """loops from the set of game IDs, extract review totals from the query_summary of STEAM's API
+    one request per game, without downloading any review content (unless sampling)
+    samplePages: 0 for totals only, otherwise also download up to this many pages of the most recent reviews (100 per page)
+    other arguments: see extract_game_reviews
+    """
+
+    urlTemplate = sampleTemplate if samplePages > 0 else summaryTemplate
+
+    summaries = []   # list of GameReviewSummary objects
+
+    gameIDs, filename, count = game_ids_to_extract(maxEmptyLines, filename, begin, count,
+        deadLetters, retryFailed, maxAttempts, backoff, queue, deadline)
+    if gameIDs is None: return
+
+    # get json data from STEAM API
+    with ParsePool(fetchers) as pool:
+        items = [(gameID, urlTemplate.substitute({'id': gameID})) for gameID in gameIDs]
+        fetch = functools.partial(fetch_review_pages, timeout=timeout, pages=max(1, samplePages))
+        for gameID, summary, error in pool.run(items, fetch, parse_review_sample, deadline):
+            if error is not None:
+                print("Errors occur when reading review summary of game %s (%s), skip..." % (gameID, type(error).__name__))
+                if deadLetters is not None: deadLetters.record(gameID, error)
+                continue
+            if deadLetters is not None: deadLetters.resolve(gameID)
+            if queue is not None: queue.mark_fetched(gameID)
+
+            summaries.append(summary)
+
+    # save list of review summaries into a JSON file
+    # (a retry pass merges into the file of the previous run)
+    save_json(os.path.join(out, "reviewSummaries.json"), summaries, retryFailed)
+
+    # print summary
+    print("Work done.\nRead %d lines starting at line %d from %s, extracted %d review summaries." % (count, begin, filename, len(summaries)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Extracts STEAM game reviews (as well as a list of userIDs)')
+    parser.add_argument(
+        '-r', '--maxemptylines', help='Maximum number of empty lines in the input file before stopping reading. Default: 5',
+        required=False, type=int, default=5)
+    parser.add_argument(
+        '-t', '--timeout', help='Timeout in seconds for http connections. Default: 120',
+        required=False, type=int, default=120)
+
+    parser.add_argument(
+        '-i', '--input', help='Input file pathname. Default: output/gameids.txt',
+        required=False, default='output/gameids.txt')
+    parser.add_argument(
+        '-o', '--out', help='Output base path', required=False, default='output')
+    parser.add_argument(
+        '--begin', help='Which line (element) to read from within the input file. Default: 0',
+        required=False, type=int, default=0)
+    parser.add_argument(
+        '-n', '--count', help='number of game IDs to extract. Default: 100',
+        required=False, type=int, default=100)
+
+    parser.add_argument(
+        '-f', '--fetchers', help='Number of concurrent requests. Default: 1',
+        required=False, type=int, default=1)
+    parser.add_argument(
+        '--summary-only', help='Only extract review totals per game (one request per game, no review content)',
+        required=False, action='store_true')
+    parser.add_argument(
+        '--samplepages', help='Requires --summary-only, also sample up to this many pages (100 reviews each) of recent reviews. Default: 0',
+        required=False, type=int, default=0)
+    parser.add_argument(
+        '--deadletters', help='Dead-letter store of failed game IDs. Default: <out>/deadLetters.db',
+        required=False, default=None)
+    parser.add_argument(
+        '--retry-failed', help='Only re-extract the failed game IDs of the dead-letter store',
+        required=False, action='store_true')
+    parser.add_argument(
+        '--maxattempts', help='Give up game IDs that failed this many times. Default: 5',
+        required=False, type=int, default=5)
+    parser.add_argument(
+        '--backoff', help='Seconds after the last attempt before a game ID is due for its first retry, doubles per attempt. Default: 2',
+        required=False, type=float, default=2.0)
+    parser.add_argument(
+        '--queue', help='Take the game IDs from this crawl queue (see crawl_scheduler.py), highest priority first, instead of the input file',
+        required=False, default=None)
+    parser.add_argument(
+        '--deadline', help='Stop extracting after this many minutes',
+        required=False, type=float, default=None)
+    
+    args = parser.parse_args(argv)
+
+    if args.samplepages > 0 and not args.summary_only:
+        parser.error("--samplepages requires --summary-only")
+
+    if not os.path.exists(args.out):
+        os.makedirs(args.out)
+
+    stage = "review_summaries" if args.summary_only else "game_reviews"
+    deadLetters = DeadLetters(args.deadletters or os.path.join(args.out, "deadLetters.db"), stage)
+    queue = CrawlQueue(args.queue, stage) if args.queue is not None else None
+    deadline = time.time() + args.deadline * 60 if args.deadline is not None else None
+
+    if args.summary_only:
+        extract_review_summaries(args.maxemptylines, args.timeout, args.input, args.out, args.begin, args.count,
+            args.fetchers, args.samplepages, deadLetters, args.retry_failed, args.maxattempts, args.backoff, queue, deadline)
+    else:
+        extract_game_reviews(args.maxemptylines, args.timeout, args.input, args.out, args.begin, args.count,
+            args.fetchers, deadLetters, args.retry_failed, args.maxattempts, args.backoff, queue, deadline)
+
+    deadLetters.close()
+    if queue is not None: queue.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+# This script reads a set/list of STEAM user IDs,
+# extracts user data (username, profile name) from STEAM's API
+# saves user avatars as images
+# and saves user data into to a JSON file
+# UPDATE: removed userIDs' first 7 digits to form their avatar filenames (because of javaScript limitation), other no change
+
+import argparse
+import functools
+import os
+import string
+import time
+import json
+import requests
+
+from .game_classes import *
+from .crawl_scheduler import CrawlQueue
+from .dead_letters import APIError, DeadLetters, retry_ids, save_json
+from .parse_pool import ParsePool, fetch_page
+
+
+def process_username(profilename: str, profileURL: str) -> str:
+    """If user has set profileURL with unique IDs, use this as username;
+    if not, make fake username from profile name"""
+
+    if "steamcommunity.com/id/" in profileURL:
+        username = profileURL.split("steamcommunity.com/id/")[1].split("/")[0]
+    else:
+        # set lowercase, remove all special chars
+        username = ''.join(c for c in profilename.lower() if c.isalnum())
+    
+    return username
+
+
+def parse_player(userID, pageData):
+    """returns the player summary of STEAM's GetPlayerSummaries JSON data (raises on failure)"""
+    data = json.loads(pageData)
+    players = data.get("response", {}).get("players", [])
+    if len(players) == 0 or "personaname" not in players[0] or "profileurl" not in players[0]:
+        raise APIError("no player data")
+    return players[0]
+
+
+def extract_user_data(APIKey, maxEmptyLines, timeout, filename, out, begin, count, fetchers=1,
+        deadLetters=None, retryFailed=False, maxAttempts=5, backoff=2.0, queue=None, deadline=None):
+    """loops from the set of user IDs and extract data from STEAM's API
+    APIKey: the API key used to retrieve data from STEAM's API
+    maxEmptyLines: maximum number of empty lines in the input file before stopping reading
+    timeout: seconds for HTTP requests
+    filename: input file pathname
+    out: output base path
+    begin: which line (element) to read from within the input file
+    count: number of users to extract
+    fetchers: number of concurrent requests
+    deadLetters: DeadLetters store recording failed user IDs, or None
+    retryFailed: re-drive only the failed user IDs of deadLetters that are due instead of reading the input file
+    maxAttempts: user IDs that failed this many times are not retried any more
+    backoff: seconds after its last attempt before a user ID is due for its first retry, doubles per attempt
+    queue: CrawlQueue to take the user IDs from, highest priority first, instead of reading the input file
+    deadline: timestamp to stop extracting at, or None
+    """
+
+    urlTemplate = string.Template(
+        'https://api.steampowered.com/ISteamUser/GetPlayerSummaries/v2?key=$key&steamids=$userid')
+
+    users = []   # list of User JSON objects
+
+    if retryFailed:
+        userIDs = [userID + "\n" for userID in retry_ids(deadLetters, maxAttempts, backoff, deadline)]   # same format as lines read from the file
+        filename = "dead letters"
+        count = len(userIDs)
+    elif queue is not None:
+        userIDs = [userID + "\n" for userID in queue.top(count)]   # most valuable first
+        filename = "crawl queue"
+    else:
+        # read userIDs from the file
+        userIDs = read_ids(filename, begin, count, maxEmptyLines)
+        if userIDs is None: return
+
+    # get json data from STEAM API
+    with ParsePool(fetchers) as pool:
+        items = [(userID, urlTemplate.substitute({'key': APIKey, 'userid': userID})) for userID in userIDs]
+        fetch = functools.partial(fetch_page, timeout=timeout)
+        for userID, userJSON, error in pool.run(items, fetch, parse_player, deadline):
+            if error is not None:
+                print("Errors occur when reading user data of user ID %s (%s), skip..." % (userID.strip(), type(error).__name__))
+                if deadLetters is not None: deadLetters.record(userID, error)
+                continue
+            if deadLetters is not None: deadLetters.resolve(userID)
+            if queue is not None: queue.mark_fetched(userID)
+
+            profileName = userJSON["personaname"]
+            profileURL = userJSON["profileurl"]
+
+            username = process_username(profileName, profileURL)
+            users.append(User(userID, username, profileName).toJSON())
+
+            # download user avatars
+            try:
+                image = requests.get(userJSON["avatarfull"]).content
+                avatarFilename = f"uid_{int(str(userID)[7:])}"   # UPDATE - REMOVE first 7 digits
+            except:
+                continue
+
+            with open(os.path.join(out, "avatars", avatarFilename), mode='wb') as img:
+                img.write(image)
+
+    # save list of User objects into a file
+    # (a retry pass merges into the file of the previous run)
+    save_json(os.path.join(out, "usersData.json"), users, retryFailed)
+    
+    # print summary
+    print("Work done.\nRead %d lines starting at line %d from %s, extracted %d users data." % (count, begin, filename, len(users)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Extracts STEAM user profile names and downloads user avatars')
+    parser.add_argument(
+        '-r', '--maxemptylines', help='Maximum number of empty lines in the input file before stopping reading. Default: 5',
+        required=False, type=int, default=5)
+    parser.add_argument(
+        '-t', '--timeout', help='Timeout in seconds for http connections. Default: 120',
+        required=False, type=int, default=120)
+
+    parser.add_argument(
+        '-i', '--input', help='Input file pathname. Default: output/userids.txt',
+        required=False, default='output/userids.txt')
+    parser.add_argument(
+        '-o', '--out', help='Output base path', required=False, default='output')
+    parser.add_argument(
+        '--begin', help='Which line (element) to read from within the input file. Default: 0',
+        required=False, type=int, default=0)
+    parser.add_argument(
+        '-n', '--count', help='number of user IDs to extract. Default: 100',
+        required=False, type=int, default=100)
+    
+    parser.add_argument(
+        '-k', '--key', help="the API key used to retrieve data from STEAM's API (required)",
+        required=True, type=str)
+
+    parser.add_argument(
+        '-f', '--fetchers', help='Number of concurrent requests. Default: 1',
+        required=False, type=int, default=1)
+    parser.add_argument(
+        '--deadletters', help='Dead-letter store of failed user IDs. Default: <out>/deadLetters.db',
+        required=False, default=None)
+    parser.add_argument(
+        '--retry-failed', help='Only re-extract the failed user IDs of the dead-letter store',
+        required=False, action='store_true')
+    parser.add_argument(
+        '--maxattempts', help='Give up user IDs that failed this many times. Default: 5',
+        required=False, type=int, default=5)
+    parser.add_argument(
+        '--backoff', help='Seconds after the last attempt before a user ID is due for its first retry, doubles per attempt. Default: 2',
+        required=False, type=float, default=2.0)
+    parser.add_argument(
+        '--queue', help='Take the user IDs from this crawl queue (see crawl_scheduler.py), highest priority first, instead of the input file',
+        required=False, default=None)
+    parser.add_argument(
+        '--deadline', help='Stop extracting after this many minutes',
+        required=False, type=float, default=None)
+
+    args = parser.parse_args(argv)
+
+    # make output folder
+    if not os.path.exists(args.out):
+        os.makedirs(args.out)
+
+    # make avatars folder
+    avatarsPath = os.path.join(args.out, "avatars")
+    if not os.path.exists(avatarsPath):
+        os.makedirs(avatarsPath)
+
+    deadLetters = DeadLetters(args.deadletters or os.path.join(args.out, "deadLetters.db"), "user_data")
+    queue = CrawlQueue(args.queue, "user_data") if args.queue is not None else None
+    deadline = time.time() + args.deadline * 60 if args.deadline is not None else None
+
+    extract_user_data(args.key, args.maxemptylines, args.timeout, args.input, args.out, args.begin, args.count,
+        args.fetchers, deadLetters, args.retry_failed, args.maxattempts, args.backoff, queue, deadline)
+
+    deadLetters.close()
+    if queue is not None: queue.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
-# This includes class definitions for class Game and GameCompany
+# This includes class definitions for class Game, GameReview, GameReviewSummary, User and UserLike
 # and helper functions to parse game release_date format
+# and a helper function to read a set/list of IDs from an input file
 
 from datetime import datetime, timezone
 
@@ -47,6 +48,23 @@ class GameReview:
         return {"gameID": self.gameID, "userID": self.userID, "reviewID": self.reviewID, "time": self.time}
 
 
+class GameReviewSummary:
+    """review totals of a game from STEAM's query_summary, plus optional statistics of a sample of its reviews"""
+    def __init__(self, gameID, total, positive, negative, score, sampleSize=0, samplePositive=0, samplePlaytime=0) -> None:
+        self.gameID = int(gameID)
+        self.total = int(total)
+        self.positive = int(positive)
+        self.negative = int(negative)
+        self.score = int(score)   # STEAM's review score 0-9 ("Overwhelmingly Positive" is 9)
+        self.sampleSize = int(sampleSize)   # number of sampled reviews, 0 if not sampled
+        self.samplePositive = int(samplePositive)   # sampled reviews voted up
+        self.samplePlaytime = int(samplePlaytime)   # mean playtime at review of sampled reviews, in minutes
+
+    def toJSON(self) -> dict:
+        return {"gameID": self.gameID, "total": self.total, "positive": self.positive, "negative": self.negative, "score": self.score,
+            "sampleSize": self.sampleSize, "samplePositive": self.samplePositive, "samplePlaytime": self.samplePlaytime}
+
+
 class User:
     def __init__(self, userID, username, profileName) -> None:
         self.userID = int(userID)   # steam userID
@@ -105,3 +123,31 @@ def convert_month(month) -> int:
     except:
         return 0
 
+
+# input files
+
+def read_ids(filename, begin, count, maxEmptyLines):
+    """reads up to count lines (IDs, with their line breaks) starting at line begin,
+    stops after maxEmptyLines empty reads; returns None if the file cannot be opened"""
+    try:
+        f = open(filename, 'r')
+    except:
+        print("Cannot open file %s" % filename)
+        return None
+
+    IDs = []
+    with f:
+        # skip the first begin lines
+        for i in range(begin):
+            f.readline()
+
+        emptyline = 0
+        for i in range(count):
+            line = f.readline()
+            if len(line) == 0:
+                emptyline += 1
+                if emptyline >= maxEmptyLines: break
+                else: continue
+            IDs.append(line)
+
+    return IDs
@@ -0,0 +1,165 @@
+# This script reads game reviews content saved by extract_game_reviews.py (text files with gameID and reviewID as path)
+# and indexes them into a SQLite FTS5 full-text table, linked to the reviews table by (game_id, review_id)
+# only reviews not indexed yet are read, in batches, so it can be re-run after every new extraction
+# doc IDs are (gameID << gameDocBits) + n, so the documents of a game are one rowid range of the full-text index
+# also provides search_reviews() for ranked keyword search, optionally filtered by game
+
+import argparse
+import os
+import sqlite3
+
+gameDocBits = 28   # up to 2^28 reviews per game, game IDs up to 2^35
+
+ftsTableSQLStrs = [
+# one row per indexed review, its rowid is also the rowid of the review in review_fts
+"""CREATE TABLE IF NOT EXISTS review_fts_docs(
+    doc_id integer PRIMARY KEY,
+    game_id integer NOT NULL,
+    review_id integer NOT NULL,
+    UNIQUE (game_id, review_id))""",
+
+"""CREATE VIRTUAL TABLE IF NOT EXISTS review_fts USING fts5(
+    content,
+    tokenize = 'unicode61 remove_diacritics 2')""",
+]
+
+
+def read_review_content(reviewsPath, gameID, reviewID):
+    """returns the review text, or None if the file is missing"""
+    try:
+        with open(os.path.join(reviewsPath, str(gameID), str(reviewID)), 'r', encoding="UTF-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def game_doc_range(gameID) -> tuple:
+    """(first, last) doc ID of a game's reviews"""
+    return gameID << gameDocBits, ((gameID + 1) << gameDocBits) - 1
+
+
+def index_reviews(DBPathname, reviewsPath, batchSize, optimize=False):
+    """indexes every review of the reviews table that is not in review_fts yet
+    DBPathname: the database's pathname
+    reviewsPath: folder holding <gameID>/<reviewID> text files
+    batchSize: number of reviews read and inserted per transaction
+    optimize: merge all index segments afterwards (rewrites the whole index, slow on large indexes)
+    """
+
+    con = sqlite3.connect(DBPathname)
+    cur = con.cursor()
+    for sqlStr in ftsTableSQLStrs:
+        cur.execute(sqlStr)
+
+    # an index whose doc IDs are not grouped by game (built before game doc ranges) is rebuilt
+    if cur.execute("SELECT 1 FROM review_fts_docs WHERE (doc_id >> ?) != game_id LIMIT 1", (gameDocBits,)).fetchone() is not None:
+        print("Rebuilding the index, its doc IDs are not grouped by game...")
+        cur.execute("DELETE FROM review_fts_docs")
+        cur.execute("DELETE FROM review_fts")
+    con.commit()
+    nextDocIDs = dict()   # gameID: next free doc ID in the game's range
+
+    indexed = 0
+    missing = 0
+    lastKey = (-1, -1)   # keyset pagination over the reviews primary key (game_id, review_id)
+
+    while True:
+        rows = cur.execute("""SELECT r.game_id, r.review_id FROM reviews r
+            LEFT JOIN review_fts_docs d ON d.game_id = r.game_id AND d.review_id = r.review_id
+            WHERE d.doc_id IS NULL AND (r.game_id, r.review_id) > (?, ?)
+            ORDER BY r.game_id, r.review_id LIMIT ?""", (lastKey[0], lastKey[1], batchSize)).fetchall()
+        if len(rows) == 0: break
+        lastKey = rows[-1]
+
+        for gameID, reviewID in rows:
+            content = read_review_content(reviewsPath, gameID, reviewID)
+            if content is None:
+                missing += 1
+                continue
+
+            if gameID not in nextDocIDs:
+                first, last = game_doc_range(gameID)
+                nextDocIDs[gameID] = cur.execute("SELECT IFNULL(MAX(doc_id) + 1, ?) FROM review_fts_docs WHERE doc_id BETWEEN ? AND ?",
+                    (first, first, last)).fetchone()[0]
+            docID = nextDocIDs[gameID]
+            nextDocIDs[gameID] += 1
+
+            cur.execute("INSERT INTO review_fts_docs (doc_id, game_id, review_id) VALUES (?, ?, ?)", (docID, gameID, reviewID))
+            cur.execute("INSERT INTO review_fts (rowid, content) VALUES (?, ?)", (docID, content))
+            indexed += 1
+
+        con.commit()   # one transaction per batch
+
+    if optimize:
+        cur.execute("INSERT INTO review_fts (review_fts) VALUES ('optimize')")   # merge index segments for faster queries
+        con.commit()
+    con.close()
+
+    # print summary
+    print("Work done.\nIndexed %d new reviews from %s, %d review files missing." % (indexed, reviewsPath, missing))
+
+
+def search_reviews(con, query, gameID=None, limit=20, offset=0) -> list:
+    """ranked keyword search, returns list of (gameID, reviewID, score, snippet), best match first
+    con: sqlite3 connection of an indexed database
+    query: FTS5 query string, for example 'boss AND fight' or '"open world"'
+    gameID: only search reviews of this game (a rowid range of the index, not a filter over all matches)
+    raises sqlite3.OperationalError if the query has an FTS5 syntax error
+    """
+    sqlStr = """SELECT d.game_id, d.review_id, bm25(review_fts), snippet(review_fts, 0, '[', ']', '...', 12)
+        FROM review_fts JOIN review_fts_docs d ON d.doc_id = review_fts.rowid
+        WHERE review_fts MATCH ?"""
+    params = [query]
+    if gameID is not None:
+        sqlStr += " AND review_fts.rowid BETWEEN ? AND ?"
+        params += game_doc_range(int(gameID))
+    sqlStr += " ORDER BY rank LIMIT ? OFFSET ?"   # rank is bm25, lower is better
+    params += [limit, offset]
+
+    return con.execute(sqlStr, params).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Indexes STEAM game reviews content for full-text search')
+
+    parser.add_argument(
+        '-d', '--db', help='SQLite database pathname (with the reviews table inserted)',
+        required=True)
+    parser.add_argument(
+        '-i', '--input', help='Reviews content folder. Default: output/reviews',
+        required=False, default='output/reviews')
+    parser.add_argument(
+        '-b', '--batchsize', help='Number of reviews indexed per transaction. Default: 5000',
+        required=False, type=int, default=5000)
+    parser.add_argument(
+        '--optimize', help='Merge all index segments after indexing (rewrites the whole index, for faster searches)',
+        required=False, action='store_true')
+    parser.add_argument(
+        '-q', '--query', help='Search the index instead of indexing. For example: "boss fight"',
+        required=False, default=None)
+    parser.add_argument(
+        '-g', '--game', help='Only search reviews of this game ID',
+        required=False, type=int, default=None)
+    parser.add_argument(
+        '-n', '--count', help='Number of search results. Default: 20',
+        required=False, type=int, default=20)
+
+    args = parser.parse_args(argv)
+
+    if args.query is None:
+        index_reviews(args.db, args.input, args.batchsize, args.optimize)
+        return
+
+    con = sqlite3.connect(args.db)
+    try:
+        results = search_reviews(con, args.query, args.game, args.count)
+    except sqlite3.OperationalError as e:
+        print("Cannot search %s: %s (quote terms with special characters, for example '\"boss-fight\"')" % (args.query, " ".join(e.args)))
+        results = []
+    for gameID, reviewID, score, snippet in results:
+        print("[%d/%d] %.3f %s" % (gameID, reviewID, score, snippet.replace("\n", " ")))
+    con.close()
+
+
+if __name__ == '__main__':
+    main()
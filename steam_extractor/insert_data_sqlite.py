@@ -1,16 +1,15 @@
 # This script reads STEAM json data from files
 # and inserts into a SQLite database
-# tables: games, game_genres, companies, develop_publish, users, likes, reviews
+# tables: games, game_genres, companies, develop_publish, users, likes, reviews, review_summaries
 # UPDATE: all userIDs have to remove the first 7 digits because of javaScript limitation!
 
 import argparse
 import sqlite3
 import json
-from argon2 import PasswordHasher
 
-from game_classes import *
+from .game_classes import *
 
-supportedTables = ["games", "game_genres", "companies", "develop_publish", "users", "likes", "reviews"]
+supportedTables = ["games", "game_genres", "companies", "develop_publish", "users", "likes", "reviews", "review_summaries"]
 
 tableInsertionSQLStrs = [
 """CREATE TABLE IF NOT EXISTS games(
@@ -58,13 +57,24 @@ tableInsertionSQLStrs = [
     UNIQUE (user_id, game_id), --a user can have only one review on a game
     PRIMARY KEY (game_id, review_id),
     FOREIGN KEY(user_id) REFERENCES users(uid),
+    FOREIGN KEY(game_id) REFERENCES games(id))""",
+
+"""CREATE TABLE IF NOT EXISTS review_summaries(
+    game_id integer PRIMARY KEY NOT NULL,
+    total integer NOT NULL,
+    positive integer NOT NULL,
+    negative integer NOT NULL,
+    score integer NOT NULL, --STEAM review score 0-9
+    sample_size integer DEFAULT 0, --number of sampled reviews, 0 if not sampled
+    sample_positive integer DEFAULT 0,
+    sample_playtime integer DEFAULT 0, --mean playtime at review in minutes
     FOREIGN KEY(game_id) REFERENCES games(id))"""
 ]
 
 
 def insert_data(DBPathname, table, filename):
     """
-    table: the table to insert, should be one of ["games", "game_genres", "companies", "develop_publish", "users", "likes", "reviews"]
+    table: the table to insert, should be one of ["games", "game_genres", "companies", "develop_publish", "users", "likes", "reviews", "review_summaries"]
     DBPathname: the database's pathname
     filename: input JSON file pathname
     """
@@ -155,6 +165,8 @@ def insert_data(DBPathname, table, filename):
                         cur.execute("UPDATE develop_publish SET dev_or_pub = ? WHERE company_id = ? AND game_id = ?", ("both", pubCompanyID, gameID))
     
     elif index == 4:   # users table
+        from argon2 import PasswordHasher   # only this table needs argon2, keep it out of the other tables' startup
+
         for userJSON in data:
             try:
                 userID = int(str(userJSON["userID"])[7:])   # UPDATE - REMOVE first 7 digits
@@ -199,11 +211,26 @@ def insert_data(DBPathname, table, filename):
             except sqlite3.Error as e:
                 print("Error:", " ".join(e.args))
 
+    elif index == 7:   # review_summaries table
+        for summaryJSON in data:
+            try:
+                summary = GameReviewSummary(summaryJSON["gameID"], summaryJSON["total"], summaryJSON["positive"], summaryJSON["negative"], summaryJSON["score"],
+                    summaryJSON["sampleSize"], summaryJSON["samplePositive"], summaryJSON["samplePlaytime"])
+            except: continue
+            if summary.gameID == 0: continue
+
+            # a newer summary of the same game replaces the old one
+            try:
+                cur.execute("INSERT OR REPLACE INTO review_summaries (game_id, total, positive, negative, score, sample_size, sample_positive, sample_playtime) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (summary.gameID, summary.total, summary.positive, summary.negative, summary.score, summary.sampleSize, summary.samplePositive, summary.samplePlaytime))
+            except sqlite3.Error as e:
+                print("Error:", " ".join(e.args))
+
     con.commit()
     con.close()
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Inserts STEAM json data from files into SQLite database')
 
     parser.add_argument(
@@ -213,10 +240,10 @@ def main():
         '-o', '--dbout', help='Output SQLite database pathname',
         required=True)
     parser.add_argument(
-        '-t', '--table', help='the table to insert, should be one of {games, game_genres, companies, develop_publish, users, likes, reviews}',
+        '-t', '--table', help='the table to insert, should be one of {games, game_genres, companies, develop_publish, users, likes, reviews, review_summaries}',
         required=True)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     insert_data(args.dbout, args.table, args.input)
 
@@ -0,0 +1,112 @@
+# This includes the fetch/parse pipeline shared by the HTML extractors
+# I/O workers (threads) download raw webpages, parser workers (processes) run BeautifulSoup on them
+# so that parsing is not serialized by the GIL and uses all cores on large crawls
+
+import itertools
+import time
+
+
+def fetch_page(URL, timeout):
+    """downloads a webpage, returns its raw bytes (raises on failure, including HTTP error statuses such as 429 and 5xx)"""
+    import requests   # imported here: only the fetcher threads need it, not every importer of this module
+    response = requests.get(URL, timeout=timeout)
+    response.raise_for_status()   # an error page must be recorded as a failure, not parsed as data
+    return response.content
+
+
+def safe_parse(parse, key, pageData):
+    """runs parse(key, pageData) in a parser process, returns (result, None) or (None, exception)"""
+    try:
+        return parse(key, pageData), None
+    except Exception as e:
+        return None, e
+
+
+class ParsePool:
+    """thread pool of fetchers feeding a process pool of parsers
+    fetchers: number of concurrent downloads
+    workers: number of parser processes, 0 parses in this process (no pool)
+    chunkSize: number of pages sent to a parser process at once
+    """
+    def __init__(self, fetchers=1, workers=0, chunkSize=16) -> None:
+        self.fetchers = max(1, fetchers)
+        self.workers = max(0, workers)
+        self.chunkSize = max(1, chunkSize)
+
+        # imported here: concurrent.futures pulls in multiprocessing, which stages not crawling do not need at startup
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        self.ioPool = ThreadPoolExecutor(self.fetchers)
+        self.cpuPool = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+
+    def window(self) -> int:
+        """number of pages in flight per step, enough to keep every fetcher and parser busy"""
+        return max(self.fetchers, max(1, self.workers) * self.chunkSize)
+
+    def run(self, items, fetch, parse, deadline=None):
+        """yields (key, parsed result, error) in input order, result is None and error is the exception
+        if the page could not be fetched or parsed
+        items: list or iterable of (key, URL), read one window ahead (a generator can be endless, stop reading results to stop it)
+        fetch: fetch(URL) -> raw page bytes, runs in the fetcher threads
+        parse: parse(key, raw page bytes) -> result, runs in the parser processes (must be a module level function)
+        deadline: timestamp after which no more downloads start, pages already downloading are still parsed and yielded
+        (items never downloaded are not yielded)
+        """
+        windowSize = self.window()
+        items = iter(items)
+        window = list(itertools.islice(items, windowSize))
+        if len(window) == 0: return
+        if deadline is not None and time.time() >= deadline:
+            print("Deadline reached, stop...")
+            return
+
+        pending = [self.ioPool.submit(fetch, URL) for key, URL in window]
+        while True:
+            pages = []   # (key, raw page, error) of the downloaded items of the window
+            stopped = False
+            for (key, URL), future in zip(window, pending):
+                if not stopped and deadline is not None and time.time() >= deadline:
+                    for other in pending: other.cancel()   # drops the downloads not started yet
+                    stopped = True
+                if future.cancelled(): continue
+                try:
+                    pages.append((key, future.result(), None))
+                except Exception as e:
+                    pages.append((key, None, e))
+
+            # start downloading the next window while this one is parsed
+            nextWindow = [] if stopped else list(itertools.islice(items, windowSize))
+            if stopped or (len(nextWindow) > 0 and deadline is not None and time.time() >= deadline):
+                print("Deadline reached, stop...")
+                nextWindow = []
+            last = len(nextWindow) == 0
+            if not last:
+                pending = [self.ioPool.submit(fetch, URL) for key, URL in nextWindow]
+
+            fetched = [(key, page) for key, page, error in pages if error is None]
+            keys = [key for key, page in fetched]
+            parses = [parse] * len(fetched)
+            if self.cpuPool is not None:
+                parsed = self.cpuPool.map(safe_parse, parses, keys, [page for key, page in fetched], chunksize=self.chunkSize)
+            else:
+                parsed = map(safe_parse, parses, keys, [page for key, page in fetched])
+            results = dict(zip(keys, parsed))
+
+            for key, page, error in pages:
+                if error is not None:
+                    yield key, None, error
+                else:
+                    yield (key,) + results[key]
+            if last: return
+            window = nextWindow
+
+    def close(self) -> None:
+        # downloads not started yet (the caller stopped reading results early) are dropped
+        self.ioPool.shutdown(cancel_futures=True)
+        if self.cpuPool is not None:
+            self.cpuPool.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,238 @@
+# This script prepares the SQLite database built by insert_data_sqlite.py for reading
+# creates secondary indexes, and aggregate tables kept up to date by triggers while data is inserted
+# aggregates: like counts per game, review counts and latest review time per game, game counts per genre and per company
+# also provides a Python API (class SteamQuery) for the common web-app queries
+
+import argparse
+import pathlib
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+from .insert_data_sqlite import supportedTables, tableInsertionSQLStrs
+
+indexSQLStrs = [
+"CREATE INDEX IF NOT EXISTS idx_game_genres_genre ON game_genres(genre, game_id)",
+"CREATE INDEX IF NOT EXISTS idx_develop_publish_game ON develop_publish(game_id)",
+"CREATE INDEX IF NOT EXISTS idx_likes_game ON likes(game_id)",
+"CREATE INDEX IF NOT EXISTS idx_reviews_user ON reviews(user_id, timestamp)",
+"CREATE INDEX IF NOT EXISTS idx_reviews_game_time ON reviews(game_id, timestamp)",
+]
+
+aggregateSQLStrs = [
+"""CREATE TABLE IF NOT EXISTS game_like_counts(
+    game_id integer PRIMARY KEY NOT NULL,
+    likes integer NOT NULL DEFAULT 0)""",
+
+"""CREATE TABLE IF NOT EXISTS game_review_stats(
+    game_id integer PRIMARY KEY NOT NULL,
+    reviews integer NOT NULL DEFAULT 0,
+    latest_timestamp integer NOT NULL DEFAULT 0) --timestamp of the latest review""",
+
+"""CREATE TABLE IF NOT EXISTS genre_game_counts(
+    genre text PRIMARY KEY NOT NULL,
+    games integer NOT NULL DEFAULT 0)""",
+
+"""CREATE TABLE IF NOT EXISTS company_game_counts(
+    company_id text PRIMARY KEY NOT NULL,
+    games integer NOT NULL DEFAULT 0)""",
+
+"CREATE INDEX IF NOT EXISTS idx_game_like_counts_likes ON game_like_counts(likes)",
+]
+
+# triggers keep the aggregate tables in sync with every insert_data() load (and deletes)
+triggerSQLStrs = [
+"""CREATE TRIGGER IF NOT EXISTS trg_likes_insert AFTER INSERT ON likes BEGIN
+    INSERT INTO game_like_counts (game_id, likes) VALUES (NEW.game_id, 1)
+        ON CONFLICT(game_id) DO UPDATE SET likes = likes + 1;
+END""",
+
+"""CREATE TRIGGER IF NOT EXISTS trg_likes_delete AFTER DELETE ON likes BEGIN
+    UPDATE game_like_counts SET likes = likes - 1 WHERE game_id = OLD.game_id;
+END""",
+
+"""CREATE TRIGGER IF NOT EXISTS trg_reviews_insert AFTER INSERT ON reviews BEGIN
+    INSERT INTO game_review_stats (game_id, reviews, latest_timestamp) VALUES (NEW.game_id, 1, NEW.timestamp)
+        ON CONFLICT(game_id) DO UPDATE SET reviews = reviews + 1, latest_timestamp = MAX(latest_timestamp, excluded.latest_timestamp);
+END""",
+
+"""CREATE TRIGGER IF NOT EXISTS trg_reviews_delete AFTER DELETE ON reviews BEGIN
+    UPDATE game_review_stats SET reviews = reviews - 1,
+        latest_timestamp = IFNULL((SELECT MAX(timestamp) FROM reviews WHERE game_id = OLD.game_id), 0)
+        WHERE game_id = OLD.game_id;
+END""",
+
+"""CREATE TRIGGER IF NOT EXISTS trg_game_genres_insert AFTER INSERT ON game_genres BEGIN
+    INSERT INTO genre_game_counts (genre, games) VALUES (NEW.genre, 1)
+        ON CONFLICT(genre) DO UPDATE SET games = games + 1;
+END""",
+
+"""CREATE TRIGGER IF NOT EXISTS trg_game_genres_delete AFTER DELETE ON game_genres BEGIN
+    UPDATE genre_game_counts SET games = games - 1 WHERE genre = OLD.genre;
+END""",
+
+"""CREATE TRIGGER IF NOT EXISTS trg_develop_publish_insert AFTER INSERT ON develop_publish BEGIN
+    INSERT INTO company_game_counts (company_id, games) VALUES (NEW.company_id, 1)
+        ON CONFLICT(company_id) DO UPDATE SET games = games + 1;
+END""",
+
+"""CREATE TRIGGER IF NOT EXISTS trg_develop_publish_delete AFTER DELETE ON develop_publish BEGIN
+    UPDATE company_game_counts SET games = games - 1 WHERE company_id = OLD.company_id;
+END""",
+]
+
+# recompute every aggregate from the base tables, used once when preparing an existing database
+rebuildSQLStrs = [
+"DELETE FROM game_like_counts",
+"INSERT INTO game_like_counts (game_id, likes) SELECT game_id, COUNT(*) FROM likes GROUP BY game_id",
+"DELETE FROM game_review_stats",
+"INSERT INTO game_review_stats (game_id, reviews, latest_timestamp) SELECT game_id, COUNT(*), MAX(timestamp) FROM reviews GROUP BY game_id",
+"DELETE FROM genre_game_counts",
+"INSERT INTO genre_game_counts (genre, games) SELECT genre, COUNT(*) FROM game_genres GROUP BY genre",
+"DELETE FROM company_game_counts",
+"INSERT INTO company_game_counts (company_id, games) SELECT company_id, COUNT(*) FROM develop_publish GROUP BY company_id",
+]
+
+
+def read_only_uri(DBPathname) -> str:
+    """SQLite URI opening the database read-only, the path is percent-encoded (it may contain ?, # or %)"""
+    return pathlib.Path(DBPathname).resolve().as_uri() + "?mode=ro"
+
+
+def prepare_database(DBPathname, rebuild=True):
+    """creates all tables, secondary indexes, aggregate tables and their triggers
+    DBPathname: the database's pathname
+    rebuild: recompute aggregates from the rows already in the database
+    after this, every insert_data() load updates the aggregates incrementally
+    """
+
+    con = sqlite3.connect(DBPathname)
+    cur = con.cursor()
+
+    for sqlStr in tableInsertionSQLStrs + indexSQLStrs + aggregateSQLStrs + triggerSQLStrs:
+        cur.execute(sqlStr)
+
+    if rebuild:
+        for sqlStr in rebuildSQLStrs:
+            cur.execute(sqlStr)
+
+    cur.execute("ANALYZE")
+    con.commit()
+    con.close()
+
+
+class SteamQuery:
+    """read-only queries over a prepared database
+    connections are pooled and reused between calls, each connection caches its prepared statements
+    (the SQL strings below are constants, so sqlite3's statement cache always hits)
+    """
+
+    LIKES_COUNT = "SELECT likes FROM game_like_counts WHERE game_id = ?"
+    MOST_LIKED = """SELECT g.id, g.title, l.likes FROM game_like_counts l JOIN games g ON g.id = l.game_id
+        ORDER BY l.likes DESC LIMIT ? OFFSET ?"""
+    USER_LIKES = "SELECT game_id FROM likes WHERE user_id = ?"
+    REVIEWS_BY_USER = """SELECT game_id, review_id, timestamp FROM reviews WHERE user_id = ?
+        ORDER BY timestamp DESC LIMIT ? OFFSET ?"""
+    REVIEWS_BY_GAME = """SELECT user_id, review_id, timestamp FROM reviews WHERE game_id = ?
+        ORDER BY timestamp DESC LIMIT ? OFFSET ?"""
+    REVIEW_STATS = "SELECT reviews, latest_timestamp FROM game_review_stats WHERE game_id = ?"
+    GAMES_BY_GENRE = """SELECT g.id, g.title, g.date FROM game_genres gg JOIN games g ON g.id = gg.game_id
+        WHERE gg.genre = ? ORDER BY gg.game_id LIMIT ? OFFSET ?"""
+    GAMES_BY_COMPANY = """SELECT g.id, g.title, g.date, dp.dev_or_pub FROM develop_publish dp JOIN games g ON g.id = dp.game_id
+        WHERE dp.company_id = ? ORDER BY dp.game_id LIMIT ? OFFSET ?"""
+    GENRE_COUNTS = "SELECT genre, games FROM genre_game_counts WHERE games > 0 ORDER BY games DESC"
+    COMPANY_COUNT = "SELECT games FROM company_game_counts WHERE company_id = ?"
+
+    def __init__(self, DBPathname, poolSize=4, cachedStatements=128) -> None:
+        self.DBPathname = DBPathname
+        self.cachedStatements = cachedStatements
+        self.pool = queue.LifoQueue(maxsize=poolSize)   # most recently used connection first, its cache is warm
+        for i in range(poolSize):
+            self.pool.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        # read-only, the pool can be shared between threads
+        con = sqlite3.connect(read_only_uri(self.DBPathname), uri=True,
+            check_same_thread=False, cached_statements=self.cachedStatements)
+        con.execute("PRAGMA query_only = 1")
+        return con
+
+    @contextmanager
+    def connection(self):
+        """borrow a connection from the pool (blocks if all are in use)"""
+        con = self.pool.get()
+        try:
+            yield con
+        finally:
+            self.pool.put(con)
+
+    def _all(self, sqlStr, params) -> list:
+        with self.connection() as con:
+            return con.execute(sqlStr, params).fetchall()
+
+    def _one(self, sqlStr, params, default=None):
+        with self.connection() as con:
+            row = con.execute(sqlStr, params).fetchone()
+        return default if row is None else row
+
+    def likes_count(self, gameID) -> int:
+        return self._one(self.LIKES_COUNT, (int(gameID),), (0,))[0]
+
+    def most_liked_games(self, limit=20, offset=0) -> list:
+        """list of (gameID, title, likes)"""
+        return self._all(self.MOST_LIKED, (limit, offset))
+
+    def user_likes(self, userID) -> list:
+        """list of gameIDs the user likes (userID without the first 7 digits)"""
+        return [row[0] for row in self._all(self.USER_LIKES, (int(userID),))]
+
+    def reviews_by_user(self, userID, limit=20, offset=0) -> list:
+        """list of (gameID, reviewID, timestamp), latest first"""
+        return self._all(self.REVIEWS_BY_USER, (int(userID), limit, offset))
+
+    def reviews_by_game(self, gameID, limit=20, offset=0) -> list:
+        """list of (userID, reviewID, timestamp), latest first"""
+        return self._all(self.REVIEWS_BY_GAME, (int(gameID), limit, offset))
+
+    def review_stats(self, gameID) -> tuple:
+        """(number of reviews, latest review timestamp)"""
+        return tuple(self._one(self.REVIEW_STATS, (int(gameID),), (0, 0)))
+
+    def games_by_genre(self, genre, limit=20, offset=0) -> list:
+        """list of (gameID, title, date), genre is lowercase"""
+        return self._all(self.GAMES_BY_GENRE, (genre.lower(), limit, offset))
+
+    def games_by_company(self, companyID, limit=20, offset=0) -> list:
+        """list of (gameID, title, date, dev_or_pub)"""
+        return self._all(self.GAMES_BY_COMPANY, (companyID.lower(), limit, offset))
+
+    def genre_counts(self) -> list:
+        """list of (genre, number of games), largest first"""
+        return self._all(self.GENRE_COUNTS, ())
+
+    def company_game_count(self, companyID) -> int:
+        return self._one(self.COMPANY_COUNT, (companyID.lower(),), (0,))[0]
+
+    def close(self) -> None:
+        while not self.pool.empty():
+            self.pool.get().close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Creates indexes and aggregate tables for reading the STEAM SQLite database')
+
+    parser.add_argument(
+        '-d', '--db', help='SQLite database pathname',
+        required=True)
+    parser.add_argument(
+        '--norebuild', help='Do not recompute aggregates from existing rows (only create missing objects)',
+        required=False, action='store_true')
+
+    args = parser.parse_args(argv)
+
+    prepare_database(args.db, not args.norebuild)
+    print("Database %s prepared: %d tables, %d indexes, %d triggers" % (args.db, len(supportedTables), len(indexSQLStrs), len(triggerSQLStrs)))
+
+
+if __name__ == '__main__':
+    main()
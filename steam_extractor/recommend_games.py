@@ -0,0 +1,218 @@
+# This script reads user likes (from the likes table of the SQLite database, or from likes.json)
+# builds a sparse user x game matrix and computes top-k item-item cosine similarities in chunks of games
+# saves the top-k similar games of each game into the SQLite database (table game_similarities)
+# incremental by default: only games whose like sets changed (and games co-liked with them) are recomputed
+# (likes table only: likes.json holds a single extraction batch, so it is always recomputed in full)
+
+import argparse
+import json
+import sqlite3
+
+import numpy as np
+import scipy.sparse as sp
+
+similarityTableSQLStrs = [
+"""CREATE TABLE IF NOT EXISTS game_similarities(
+    game_id integer NOT NULL,
+    rank integer NOT NULL, --0 is the most similar
+    similar_game_id integer NOT NULL,
+    score real NOT NULL, --cosine similarity
+    PRIMARY KEY (game_id, rank))""",
+
+"CREATE INDEX IF NOT EXISTS idx_game_similarities_similar ON game_similarities(similar_game_id)",
+
+"""CREATE TABLE IF NOT EXISTS game_like_signatures(
+    game_id integer PRIMARY KEY NOT NULL,
+    likes integer NOT NULL,
+    checksum integer NOT NULL) --order independent hash of the set of users who like the game""",
+]
+
+
+def load_likes_sqlite(DBPathname, chunkSize=1000000):
+    """reads the likes table in chunks, returns two int64 arrays (userIDs, gameIDs)"""
+    con = sqlite3.connect(DBPathname)
+    cur = con.execute("SELECT user_id, game_id FROM likes")
+    chunks = []
+    while True:
+        rows = cur.fetchmany(chunkSize)
+        if len(rows) == 0: break
+        chunks.append(np.array(rows, dtype=np.int64))
+    con.close()
+
+    if len(chunks) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    likes = np.concatenate(chunks)
+    return likes[:, 0], likes[:, 1]
+
+
+def load_likes_json(filename):
+    """reads likes.json (list of UserLike dicts), returns two int64 arrays (userIDs, gameIDs)"""
+    with open(filename, 'r', encoding="UTF-8") as f:
+        data = json.load(f)
+    userIDs = np.fromiter((like["userID"] for like in data), dtype=np.int64, count=len(data))
+    gameIDs = np.fromiter((like["gameID"] for like in data), dtype=np.int64, count=len(data))
+    return userIDs, gameIDs
+
+
+def build_matrix(userIDs, gameIDs):
+    """returns (X, users, games): X is a binary users x games CSC matrix,
+    users and games map matrix row / column indexes back to IDs"""
+    users, userIdx = np.unique(userIDs, return_inverse=True)
+    games, gameIdx = np.unique(gameIDs, return_inverse=True)
+    X = sp.csc_matrix((np.ones(len(userIdx), dtype=np.float32), (userIdx, gameIdx)), shape=(len(users), len(games)))
+    X.sum_duplicates()
+    X.data[:] = 1.0   # a like is a like, even if it was loaded twice
+    return X, users, games
+
+
+def like_signatures(X, users):
+    """returns (likes, checksum) arrays per game column, the checksum does not depend on row order"""
+    mixed = users[X.indices].astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    mixed ^= mixed >> np.uint64(29)
+    likes = np.diff(X.indptr)
+    # every column has at least one like, so reduceat never sees an empty segment
+    checksum = np.add.reduceat(mixed, X.indptr[:-1]) if len(mixed) > 0 else np.empty(0, dtype=np.uint64)
+    return likes.astype(np.int64), checksum.view(np.int64)
+
+
+def top_k_similarities(X, columns, k, chunkSize):
+    """yields (column, similar columns, scores) for each requested game column, best first
+    X: binary users x games CSC matrix
+    columns: game column indexes to compute
+    k: number of similar games to keep
+    chunkSize: number of games multiplied at once, bounds the memory of the partial similarity matrix
+    """
+    norms = np.sqrt(np.asarray(X.sum(axis=0)).ravel()).astype(np.float32)
+    Xn = (X @ sp.diags(1.0 / norms)).tocsc()   # unit length columns
+    XnT = Xn.T.tocsr()   # games x users
+
+    for start in range(0, len(columns), chunkSize):
+        chunk = columns[start:start + chunkSize]
+        S = (XnT[chunk] @ Xn).tocsr()   # chunk x games cosine similarities, only co-liked pairs are non zero
+
+        for row, column in enumerate(chunk):
+            begin, end = S.indptr[row], S.indptr[row + 1]
+            similar = S.indices[begin:end]
+            scores = S.data[begin:end]
+
+            keep = similar != column   # a game is not similar to itself
+            similar, scores = similar[keep], scores[keep]
+            if len(scores) > k:
+                best = np.argpartition(-scores, k - 1)[:k]
+                similar, scores = similar[best], scores[best]
+
+            order = np.lexsort((similar, -scores))   # highest score first, ties by column
+            yield column, similar[order], scores[order]
+
+
+def affected_columns(con, X, games, likes, checksum):
+    """returns (columns to recompute, removed gameIDs) compared to the signatures saved last time"""
+    saved = dict((gameID, (n, c)) for gameID, n, c in con.execute("SELECT game_id, likes, checksum FROM game_like_signatures"))
+
+    changed = np.array([i for i, gameID in enumerate(games.tolist())
+        if saved.get(gameID) != (int(likes[i]), int(checksum[i]))], dtype=np.int64)
+    removed = set(saved) - set(games.tolist())
+    if len(changed) == 0 and len(removed) == 0:
+        return changed, removed
+
+    # games co-liked with a changed game: their scores against it changed as well
+    users = np.unique(X[:, changed].indices)
+    coliked = np.unique(X.tocsr()[users].indices)
+
+    # games whose saved lists point to a changed or removed game, even if they no longer share users with it
+    changedIDs = games[changed].tolist() + list(removed)
+    referring = set()
+    for start in range(0, len(changedIDs), 500):
+        part = changedIDs[start:start + 500]
+        referring.update(row[0] for row in con.execute(
+            "SELECT DISTINCT game_id FROM game_similarities WHERE similar_game_id IN (%s)" % ",".join("?" * len(part)), part))
+    columnOf = dict((gameID, i) for i, gameID in enumerate(games.tolist()))
+    referringIdx = np.array([columnOf[gameID] for gameID in referring if gameID in columnOf], dtype=np.int64)
+
+    return np.union1d(np.union1d(changed, coliked), referringIdx).astype(np.int64), removed
+
+
+def compute_similarities(DBPathname, userIDs, gameIDs, k, chunkSize, full):
+    """computes and saves top-k similar games
+    DBPathname: the database's pathname (results are written there)
+    userIDs, gameIDs: int64 arrays of likes
+    k: number of similar games per game
+    chunkSize: number of games multiplied at once
+    full: recompute every game instead of only the affected ones
+    """
+
+    con = sqlite3.connect(DBPathname)
+    cur = con.cursor()
+    for sqlStr in similarityTableSQLStrs:
+        cur.execute(sqlStr)
+
+    X, users, games = build_matrix(userIDs, gameIDs)
+    likes, checksum = like_signatures(X, users)
+
+    if full:
+        columns, removed = np.arange(len(games), dtype=np.int64), set()
+        cur.execute("DELETE FROM game_similarities")
+        cur.execute("DELETE FROM game_like_signatures")
+    else:
+        columns, removed = affected_columns(con, X, games, likes, checksum)
+
+    for gameID in removed:
+        cur.execute("DELETE FROM game_similarities WHERE game_id = ?", (gameID,))
+        cur.execute("DELETE FROM game_like_signatures WHERE game_id = ?", (gameID,))
+
+    for column, similar, scores in top_k_similarities(X, columns, k, chunkSize):
+        gameID = int(games[column])
+        cur.execute("DELETE FROM game_similarities WHERE game_id = ?", (gameID,))
+        cur.executemany("INSERT INTO game_similarities (game_id, rank, similar_game_id, score) VALUES (?, ?, ?, ?)",
+            [(gameID, rank, int(games[s]), float(score)) for rank, (s, score) in enumerate(zip(similar, scores))])
+        cur.execute("INSERT OR REPLACE INTO game_like_signatures (game_id, likes, checksum) VALUES (?, ?, ?)",
+            (gameID, int(likes[column]), int(checksum[column])))
+
+    con.commit()
+    con.close()
+
+    # print summary
+    print("Work done.\nRead %d likes of %d users on %d games, recomputed top-%d similar games of %d games, removed %d games." % (len(userIDs), len(users), len(games), k, len(columns), len(removed)))
+
+
+def similar_games(con, gameID, limit=10) -> list:
+    """list of (similar gameID, score), most similar first"""
+    return con.execute("SELECT similar_game_id, score FROM game_similarities WHERE game_id = ? ORDER BY rank LIMIT ?",
+        (int(gameID), limit)).fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Computes item-item similar STEAM games from user likes')
+
+    parser.add_argument(
+        '-d', '--db', help='SQLite database pathname (reads the likes table unless --input is given, results are saved here)',
+        required=True)
+    parser.add_argument(
+        '-i', '--input', help='Read likes from this JSON file instead of the likes table, requires --full. For example: "output/likes.json"',
+        required=False, default=None)
+    parser.add_argument(
+        '-k', '--topk', help='Number of similar games to keep per game. Default: 20',
+        required=False, type=int, default=20)
+    parser.add_argument(
+        '--chunksize', help='Number of games multiplied at once (bounds memory). Default: 1000',
+        required=False, type=int, default=1000)
+    parser.add_argument(
+        '--full', help='Recompute all games instead of only the games whose likes changed',
+        required=False, action='store_true')
+
+    args = parser.parse_args(argv)
+
+    # likes.json only holds the likes of the last extraction batch, games missing from it would be taken as removed
+    if args.input is not None and not args.full:
+        parser.error("--input requires --full, incremental runs need the cumulative likes table")
+
+    if args.input is None:
+        userIDs, gameIDs = load_likes_sqlite(args.db)
+    else:
+        userIDs, gameIDs = load_likes_json(args.input)
+
+    compute_similarities(args.db, userIDs, gameIDs, args.topk, args.chunksize, args.full)
+
+
+if __name__ == '__main__':
+    main()
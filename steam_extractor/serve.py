@@ -0,0 +1,116 @@
+# This module is the "serve" mode of the command line (cli.py)
+# a long running process executes batches of stage subcommands sent over a local TCP socket, one at a time,
+# so stage modules stay imported between batches; submit() is the matching client
+# every request carries a random token the server writes into a file only its user can read,
+# so other local users (or web pages reaching 127.0.0.1) cannot run stages as the server's user
+
+import contextlib
+import hmac
+import io
+import json
+import os
+import secrets
+import signal
+import socket
+import socketserver
+
+from .cli import import_stage, run_subcommand
+
+
+def token_path(port) -> str:
+    """default pathname of the token file of the server on port"""
+    return os.path.join(os.path.expanduser("~"), ".steam_extractor_%d.token" % port)
+
+
+def write_token(pathname) -> str:
+    """writes a new random token into a file readable by this user only (0600), returns the token"""
+    token = secrets.token_hex(32)
+    if os.path.exists(pathname):
+        os.remove(pathname)   # O_CREAT does not change the mode of an existing file
+    fd = os.open(pathname, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token)
+    return token
+
+
+def read_token(pathname) -> str:
+    with open(pathname, 'r') as f:
+        return f.read().strip()
+
+
+class BatchHandler(socketserver.StreamRequestHandler):
+    """one JSON request per line: {"token": server token, "argv": [subcommand, options...], "cwd": working directory (optional)}
+    answers one JSON line per request: {"status": exit status, "output": captured stdout and stderr}
+    a request with a wrong token is answered with status 2 and the connection is closed
+    """
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                argv = [str(arg) for arg in request["argv"]]
+            except:
+                self.reply(2, "Cannot parse request: %s" % line[:200])
+                continue
+            if not hmac.compare_digest(str(request.get("token", "")).encode("UTF-8"), self.server.token.encode("UTF-8")):
+                self.reply(2, "Invalid token")
+                return
+            if len(argv) == 0:
+                self.reply(2, "Empty argv")
+                continue
+
+            output = io.StringIO()
+            cwd = os.getcwd()
+            try:
+                os.chdir(request.get("cwd", cwd))   # relative paths of the batch are the client's
+                with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                    status = run_subcommand(argv[0], argv[1:])
+            except Exception as e:
+                status = 1
+                output.write("Error: %s: %s\n" % (type(e).__name__, e))
+            finally:
+                os.chdir(cwd)
+
+            self.reply(status, output.getvalue())
+
+    def reply(self, status, output) -> None:
+        self.wfile.write((json.dumps({"status": status, "output": output}) + "\n").encode("UTF-8"))
+        self.wfile.flush()
+
+
+def stop_serving(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(port, preload, tokenPathname=None) -> None:
+    """runs batches sent to 127.0.0.1:port one at a time, until interrupted
+    preload: subcommands whose modules are imported before accepting batches
+    tokenPathname: file the token is written to, default token_path(port), removed when the server stops
+    """
+    for name in preload:
+        import_stage(name)
+
+    tokenPathname = tokenPathname or token_path(port)
+    socketserver.TCPServer.allow_reuse_address = True
+    with socketserver.TCPServer(("127.0.0.1", port), BatchHandler) as server:   # one batch at a time, stages are not thread safe
+        server.token = write_token(tokenPathname)
+        print("Serving on 127.0.0.1:%d, token in %s, preloaded: %s" % (port, tokenPathname, preload))
+        signal.signal(signal.SIGTERM, stop_serving)   # kill/terminate() also removes the token file
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(tokenPathname)
+
+
+def submit(port, argv, timeout=None, tokenPathname=None) -> int:
+    """sends one batch to a running server, prints its output and returns its exit status
+    tokenPathname: the server's token file, default token_path(port)
+    """
+    token = read_token(tokenPathname or token_path(port))
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as sock:
+        sock.sendall((json.dumps({"token": token, "argv": argv, "cwd": os.getcwd()}) + "\n").encode("UTF-8"))
+        with sock.makefile('r', encoding="UTF-8") as f:
+            response = json.loads(f.readline())
+    print(response["output"], end="")
+    return response["status"]